@@ -25,48 +25,95 @@ Usage in .claude/settings.json:
     }]
   }
 }
+
+Set AIWCLI_HOOK_DEBUG=true to print trace output for each step.
 """
 import json
+import os
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 # Add parent directories to path for imports
-script_dir = Path(__file__).resolve().parent
-lib_dir = script_dir.parent / "lib"
-sys.path.insert(0, str(lib_dir.parent))
+_SHARED_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SHARED_ROOT not in sys.path:
+    sys.path.insert(0, _SHARED_ROOT)
+
+# lib.context.* is imported lazily in on_plan_archive() so that events this
+# hook ignores don't pay for loading the context modules
+from lib.base.utils import project_dir
+
+# Log lines are buffered and written once per stream at exit; with stdout
+# piped to Claude Code every print() would otherwise be its own write()
+_out_buf: List[str] = []
+_err_buf: List[str] = []
+
+
+def _log(msg: str = "") -> None:
+    """Buffer a line for stdout."""
+    _out_buf.append(msg)
+
+
+def _elog(msg: str) -> None:
+    """Buffer a line for stderr."""
+    _err_buf.append(msg)
+
+
+def _flush_logs() -> None:
+    """Write buffered log lines, one write per stream."""
+    if _out_buf:
+        sys.stdout.write("\n".join(_out_buf) + "\n")
+        sys.stdout.flush()
+        _out_buf.clear()
+    if _err_buf:
+        sys.stderr.write("\n".join(_err_buf) + "\n")
+        sys.stderr.flush()
+        _err_buf.clear()
+
+
+_IS_WIN32 = sys.platform == "win32"
+
+# Trace logging is opt-in; production runs skip the formatting entirely
+_DEBUG = os.environ.get("AIWCLI_HOOK_DEBUG") == "true"
 
-from lib.context.plan_archive import archive_plan_to_context
-from lib.context.context_manager import get_all_contexts
-from lib.base.utils import eprint, project_dir
+# Claude Code's plan directory (~/.claude/plans/), resolved once per process
+_CLAUDE_PLANS_DIR = Path.home() / ".claude" / "plans"
 
+# ExitPlanMode result line: "Your plan has been saved to: <path>.md"
+_PLAN_SAVED_MARKER = "Your plan has been saved to:"
 
-def get_context_for_session(session_id: str, project_root: Path) -> Optional[str]:
+
+def get_context_for_session(session_id: str, contexts: List["Context"]) -> Optional["Context"]:
     """
     Find context that matches this session_id.
 
     Args:
         session_id: Session ID to match
-        project_root: Project root directory
+        contexts: Active contexts, loaded once per hook invocation
 
     Returns:
-        Context ID or None if not found
+        Matching Context or None if not found
     """
-    contexts = get_all_contexts(status="active", project_root=project_root)
-
-    # Primary strategy: Find context with matching session_id
+    # Single pass: a session_id match wins outright; meanwhile track planning
+    # contexts for the fallback (if only one is planning, assume it's the one)
+    planning_ctx = None
+    planning_count = 0
     for ctx in contexts:
-        if ctx.in_flight and ctx.in_flight.session_ids and session_id in ctx.in_flight.session_ids:
-            eprint(f"[archive_plan] Found context by session: {ctx.id}")
-            return ctx.id
-
-    # Fallback: If only one context is planning, assume it's the one
-    planning_contexts = [c for c in contexts if c.in_flight and c.in_flight.mode == "planning"]
-    if len(planning_contexts) == 1:
-        eprint(f"[archive_plan] Fallback: Single planning context: {planning_contexts[0].id}")
-        return planning_contexts[0].id
-
-    eprint(f"[archive_plan] Could not find context for session {session_id}")
+        in_flight = ctx.in_flight
+        if not in_flight:
+            continue
+        if in_flight.session_ids and session_id in in_flight.session_ids:
+            _elog(f"[archive_plan] Found context by session: {ctx.id}")
+            return ctx
+        if in_flight.mode == "planning":
+            planning_count += 1
+            planning_ctx = ctx
+
+    if planning_count == 1:
+        _elog(f"[archive_plan] Fallback: Single planning context: {planning_ctx.id}")
+        return planning_ctx
+
+    _elog(f"[archive_plan] Could not find context for session {session_id}")
     return None
 
 
@@ -75,12 +122,47 @@ def extract_plan_path_from_result(tool_result: str) -> Optional[str]:
     Extract plan path from ExitPlanMode tool result.
 
     Looks for pattern: "Your plan has been saved to: <path>"
+
+    The prefix is a fixed literal, so this is plain find/slice rather than a
+    regex: skip whitespace after the marker, take the rest of that line, and
+    cut it at the last ".md".
     """
-    import re
-    match = re.search(r'Your plan has been saved to:\s*(.+\.md)', tool_result)
-    if match:
-        return match.group(1).strip()
-    return None
+    i = tool_result.find(_PLAN_SAVED_MARKER)
+    if i < 0:
+        return None
+    rest = tool_result[i + len(_PLAN_SAVED_MARKER):].lstrip()
+    end = rest.find("\n")
+    line = rest if end < 0 else rest[:end]
+    md = line.rfind(".md")
+    if md < 0:
+        return None
+    return line[:md + 3].strip() or None
+
+
+def _resolve_plan_file(plan_path: str, project_root: Path) -> str:
+    """Resolve plan path against project root; absolute paths are used as-is.
+
+    Works on plain strings - archive_plan_to_context takes a str anyway.
+    """
+    if os.path.isabs(plan_path):
+        return plan_path
+    return os.path.join(str(project_root), plan_path)
+
+
+def _resolve_plan_file_win32(plan_path: str, project_root: Path) -> str:
+    """Windows variant: absolute paths on another drive are still used as-is."""
+    if not os.path.isabs(plan_path):
+        return os.path.join(str(project_root), plan_path)
+    plan_drive = os.path.splitdrive(plan_path)[0].upper()
+    project_drive = os.path.splitdrive(str(project_root))[0].upper()
+    if plan_drive and project_drive and plan_drive != project_drive:
+        _log(f"[archive_plan] Plan is on drive {plan_drive}, project on {project_drive}")
+    return plan_path
+
+
+# Bind the platform-specific resolver once at import
+if _IS_WIN32:
+    _resolve_plan_file = _resolve_plan_file_win32
 
 
 def on_plan_archive():
@@ -90,55 +172,62 @@ def on_plan_archive():
     Called from PostToolUse on ExitPlanMode - extracts plan path from result
     and archives to the active context.
     """
-    # Read hook input from stdin
+    # Read hook input from stdin in one read; json.loads accepts raw bytes
+    raw = sys.stdin.buffer.read()
     try:
-        hook_input = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        eprint("[archive_plan] No valid JSON input")
+        hook_input = json.loads(raw) if raw.strip() else None
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        hook_input = None
+    if not isinstance(hook_input, dict):
+        _elog("[archive_plan] No valid JSON input")
         return
 
+    # Destructure the keys this hook uses once, up front
     hook_event = hook_input.get("hook_event_name", "unknown")
     tool_name = hook_input.get("tool_name", "")
-    print(f"[archive_plan] Hook triggered: {hook_event}")
-    print(f"[archive_plan] Tool name: {tool_name}")
-    print(f"[archive_plan] Hook input keys: {list(hook_input.keys())}")
+    tool_input = hook_input.get("tool_input") or {}
+    tool_result = hook_input.get("tool_result", "")
+    session_id = hook_input.get("session_id", "unknown")
+    stop_active = hook_input.get("stop_hook_active", False)
+    permission_mode = hook_input.get("permission_mode", "default")
 
     # Special handling for ExitPlanMode - don't check permission_mode
     is_exit_plan_mode = (hook_event == "PostToolUse" and tool_name == "ExitPlanMode")
 
-    if is_exit_plan_mode:
-        print("[archive_plan] ExitPlanMode detected, proceeding with archival")
-    else:
-        # Check if we're in plan mode for other hooks
-        permission_mode = hook_input.get("permission_mode", "default")
-        print(f"[archive_plan] Permission mode: {permission_mode}")
-
-        if permission_mode != "plan":
-            print("[archive_plan] Not in plan mode, skipping archival")
-            return
+    # Fast reject before any logging or filesystem work: most events that
+    # reach this hook are not ExitPlanMode and not in plan mode
+    if not is_exit_plan_mode and permission_mode != "plan":
+        return
 
     # Prevent infinite loops from stop_hook_active
-    if hook_input.get("stop_hook_active", False):
-        print("[archive_plan] Stop hook already active, skipping to prevent loop")
+    if stop_active:
+        _log("[archive_plan] Stop hook already active, skipping to prevent loop")
         return
 
-    print(f"[archive_plan] Proceeding with archival via {hook_event}")
+    if _DEBUG:
+        _log(f"[archive_plan] Hook triggered: {hook_event}")
+        _log(f"[archive_plan] Tool name: {tool_name}")
+        _log(f"[archive_plan] Hook input keys: {list(hook_input.keys())}")
+        if is_exit_plan_mode:
+            _log("[archive_plan] ExitPlanMode detected, proceeding with archival")
+        else:
+            _log("[archive_plan] Permission mode: plan")
+        _log(f"[archive_plan] Proceeding with archival via {hook_event}")
+
+    from lib.context.plan_archive import archive_plan_to_context
+    from lib.context.context_manager import get_all_contexts
 
     # Get project root from hook input or environment
     project_root = project_dir(hook_input)
 
-    # Get plan path from hook input
-    tool_input = hook_input.get("tool_input", {})
-    tool_result = hook_input.get("tool_result", "")
-
     # Try to find plan path in various locations
     plan_path = None
 
     # For ExitPlanMode, extract plan path from tool result first
     if is_exit_plan_mode and tool_result:
         plan_path = extract_plan_path_from_result(tool_result)
-        if plan_path:
-            print(f"[archive_plan] Extracted plan path from ExitPlanMode result: {plan_path}")
+        if plan_path and _DEBUG:
+            _log(f"[archive_plan] Extracted plan path from ExitPlanMode result: {plan_path}")
 
     # Check if plan path is directly provided in tool_input
     if not plan_path and "plan_path" in tool_input:
@@ -148,23 +237,31 @@ def on_plan_archive():
 
     # If not found yet, search standard locations
     if not plan_path:
-        print("[archive_plan] No plan_path found, searching standard locations...")
+        if _DEBUG:
+            _log("[archive_plan] No plan_path found, searching standard locations...")
+            _log(f"[archive_plan] Checking Claude plans dir: {_CLAUDE_PLANS_DIR}")
         # Look for plan in common locations
         possible_paths = []
 
         # Check Claude Code plan directory first (~/.claude/plans/)
-        claude_plans_dir = Path.home() / ".claude" / "plans"
-        print(f"[archive_plan] Checking Claude plans dir: {claude_plans_dir}")
-        if claude_plans_dir.exists():
-            # Find any .md file in Claude plans directory
-            claude_plans = list(claude_plans_dir.glob("*.md"))
-            print(f"[archive_plan] Found {len(claude_plans)} .md files in Claude plans dir")
+        # Single scandir pass - DirEntry carries file type and cached stat
+        try:
+            with os.scandir(_CLAUDE_PLANS_DIR) as it:
+                entries = [
+                    e for e in it
+                    if e.name.endswith(".md") and e.is_file()
+                ]
+        except OSError:
+            entries = []
+        if entries:
             # Sort by modification time, newest first
-            if claude_plans:
-                claude_plans.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-                possible_paths.extend(claude_plans)
+            entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+            claude_plans = [Path(e.path) for e in entries]
+            possible_paths.extend(claude_plans)
+            if _DEBUG:
+                _log(f"[archive_plan] Found {len(entries)} .md files in Claude plans dir")
                 for p in claude_plans[:3]:  # Show first 3
-                    print(f"[archive_plan]   - {p}")
+                    _log(f"[archive_plan]   - {p}")
 
         # Existing fallback paths
         possible_paths.extend([
@@ -174,88 +271,74 @@ def on_plan_archive():
         ])
 
         for path in possible_paths:
-            if path.exists():
-                plan_path = str(path)
-                break
+            try:
+                os.stat(path)
+            except OSError:
+                continue
+            plan_path = str(path)
+            break
 
     if not plan_path:
-        eprint("[archive_plan] Could not determine plan path")
+        _elog("[archive_plan] Could not determine plan path")
         # Don't block - let ExitPlanMode proceed
-        print("[archive_plan] Could not find plan file in any of these locations:")
-        print(f"  - ~/.claude/plans/*.md")
-        print(f"  - {project_root}/_output/cc-native/plans/current-plan.md")
-        print(f"  - {project_root}/_output/plans/current-plan.md")
-        print(f"  - {project_root}/plan.md")
-        print("Plan archival skipped: no plan path found")
+        _log("[archive_plan] Could not find plan file in any of these locations:")
+        _log(f"  - ~/.claude/plans/*.md")
+        _log(f"  - {project_root}/_output/cc-native/plans/current-plan.md")
+        _log(f"  - {project_root}/_output/plans/current-plan.md")
+        _log(f"  - {project_root}/plan.md")
+        _log("Plan archival skipped: no plan path found")
         return
 
-    print(f"[archive_plan] Found plan at: {plan_path}")
-
     # Resolve plan path relative to project root
-    plan_file = Path(plan_path)
-    if not plan_file.is_absolute():
-        # Ensure we have a valid project_root
-        if project_root is None:
-            project_root = project_dir()
-        plan_file = project_root / plan_path
-    else:
-        # On Windows, check if absolute path is on a different drive than project_root
-        # In that case, use the absolute path as-is
-        if sys.platform == 'win32':
-            try:
-                # Check if drives match (e.g., C: vs D:)
-                plan_drive = plan_file.drive.upper() if plan_file.drive else None
-                project_drive = project_root.drive.upper() if hasattr(project_root, 'drive') and project_root.drive else None
-                if plan_drive and project_drive and plan_drive != project_drive:
-                    # Different drives - use absolute path as-is
-                    pass  # plan_file is already set correctly
-            except Exception:
-                pass  # Fall through to use plan_file as-is
-
-    print(f"[archive_plan] Resolved plan file path: {plan_file}")
-
-    if not plan_file.exists():
-        eprint(f"[archive_plan] Plan file not found: {plan_file}")
-        print(f"[archive_plan] ERROR: File does not exist at resolved path")
-        print(f"Plan archival skipped: file not found ({plan_path})")
-        return
+    plan_file = _resolve_plan_file(plan_path, project_root)
+
+    if _DEBUG:
+        _log(f"[archive_plan] Found plan at: {plan_path}")
+        _log(f"[archive_plan] Resolved plan file path: {plan_file}")
+
+    # Load active contexts once - reused for session lookup and duplicate check
+    contexts = get_all_contexts(status="active", project_root=project_root)
 
     # Find context by session ID
-    session_id = hook_input.get("session_id", "unknown")
-    context_id = get_context_for_session(session_id, project_root)
+    ctx = get_context_for_session(session_id, contexts)
 
-    if not context_id:
-        eprint("[archive_plan] Could not determine context for session")
-        print("Plan archival failed: no context found for this session")
+    if not ctx:
+        _elog("[archive_plan] Could not determine context for session")
+        _log("Plan archival failed: no context found for this session")
         return
+    context_id = ctx.id
 
-    # Check if plan was already archived (avoid duplicates)
-    contexts = get_all_contexts(status="active", project_root=project_root)
-    for ctx in contexts:
-        if ctx.id == context_id:
-            if ctx.in_flight and ctx.in_flight.mode == "pending_implementation":
-                print(f"[archive_plan] Plan already archived for context '{context_id}', skipping")
-                return
-            break
+    # Check if plan was already archived (avoid duplicates) - the matched
+    # context is already in hand, no second lookup needed
+    if ctx.in_flight and ctx.in_flight.mode == "pending_implementation":
+        _log(f"[archive_plan] Plan already archived for context '{context_id}', skipping")
+        return
 
-    # Archive the plan
-    archived_path, plan_hash = archive_plan_to_context(
-        str(plan_file),
-        context_id,
-        project_root
-    )
+    # Archive the plan - a missing file surfaces from the read itself
+    # rather than from a separate exists() probe
+    try:
+        archived_path, plan_hash = archive_plan_to_context(
+            plan_file,
+            context_id,
+            project_root
+        )
+    except FileNotFoundError:
+        _elog(f"[archive_plan] Plan file not found: {plan_file}")
+        _log(f"[archive_plan] ERROR: File does not exist at resolved path")
+        _log(f"Plan archival skipped: file not found ({plan_path})")
+        return
 
     if archived_path:
-        print(f"")
-        print(f"[archive_plan] SUCCESS!")
-        print(f"[archive_plan] Plan archived to context: {context_id}")
-        print(f"[archive_plan] Archived path: {archived_path}")
-        print(f"[archive_plan] Source path: {plan_file}")
-        print(f"[archive_plan] Hash: {plan_hash}")
-        print(f"")
-        print("After /clear, SessionStart will auto-continue this context for implementation.")
+        _log()
+        _log(f"[archive_plan] SUCCESS!")
+        _log(f"[archive_plan] Plan archived to context: {context_id}")
+        _log(f"[archive_plan] Archived path: {archived_path}")
+        _log(f"[archive_plan] Source path: {plan_file}")
+        _log(f"[archive_plan] Hash: {plan_hash}")
+        _log()
+        _log("After /clear, SessionStart will auto-continue this context for implementation.")
     else:
-        print(f"[archive_plan] FAILED: Could not archive plan for context '{context_id}'")
+        _log(f"[archive_plan] FAILED: Could not archive plan for context '{context_id}'")
 
 
 if __name__ == "__main__":
@@ -263,8 +346,10 @@ if __name__ == "__main__":
         on_plan_archive()
     except Exception as e:
         # Log errors to stderr
-        eprint(f"[archive_plan] Error: {e}")
+        _elog(f"[archive_plan] Error: {e}")
         import traceback
-        eprint(traceback.format_exc())
+        _elog(traceback.format_exc())
         # Exit cleanly so hook doesn't block
         sys.exit(0)
+    finally:
+        _flush_logs()
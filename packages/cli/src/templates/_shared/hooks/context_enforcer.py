@@ -35,19 +35,25 @@ Hook input (from Claude Code):
 Hook output:
 - Exit 0 + stdout: Context selected, continues with system reminder
 - Exit 2 + stderr: Block request, show context picker to user
+
+Set AIWCLI_HOOK_DEBUG=true to trace which path selected the context.
 """
-import json
 import os
 import re
 import sys
-from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import List, NamedTuple, Optional, Tuple
+
+# Standalone fast path: internal subprocess calls skip the hook entirely, so
+# exit before importing lib.context. Mirrors is_internal_call(), which stays
+# the canonical check in determine_context for importers.
+if __name__ == "__main__" and os.environ.get("AIWCLI_INTERNAL_CALL") == "true":
+    sys.exit(0)
 
 # Add parent directories to path for imports
-SCRIPT_DIR = Path(__file__).resolve().parent
-SHARED_LIB = SCRIPT_DIR.parent / "lib"
-sys.path.insert(0, str(SHARED_LIB.parent))
+_SHARED_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SHARED_ROOT not in sys.path:  # already set when imported by user_prompt_submit
+    sys.path.insert(0, _SHARED_ROOT)
 
 from lib.base.subprocess_utils import is_internal_call
 from lib.context.context_manager import (
@@ -56,7 +62,7 @@ from lib.context.context_manager import (
     get_all_in_flight_contexts,
     create_context_from_prompt,
     get_context_by_session_id,
-    complete_context,
+    complete_contexts,
     update_plan_status,
 )
 from lib.context.discovery import (
@@ -70,12 +76,69 @@ from lib.context.discovery import (
 from lib.templates.formatters import get_mode_display
 from lib.base.utils import eprint, project_dir
 
+# Trace logging for each decision; failures are always reported
+_DEBUG = os.environ.get("AIWCLI_HOOK_DEBUG") == "true"
+
 # Minimum characters required for new context description
 MIN_NEW_CONTEXT_CHARS = 10
 
+# Prompts that don't represent work - skip context auto-creation
+SKIP_AUTO_CREATE_PREFIXES = (
+    "/help", "/clear", "/status", "hello", "hi", "hey",
+    "thanks", "thank you", "bye", "goodbye",
+)
+_SKIP_PREFIX_SCAN_LEN = max(map(len, SKIP_AUTO_CREATE_PREFIXES))
+
+# Caret prefix: "^<command>" optionally followed by whitespace and the prompt
+_CARET_RE = re.compile(r'^\^(\S+)(?:\s+(.*))?$', re.DOTALL)
+
+# Chained command token: E<N>, E<N>+, E* (group 1) or S<N> (group 2)
+_CMD_TOKEN_RE = re.compile(r'[Ee](\*|\d+\+?)|[Ss](\d+)')
+
+# Caret commands other than ^0 when no contexts exist
+_NO_CONTEXTS_HINT = (
+    "No existing contexts to select. Use ^0 <description> to create a new context.\n"
+    "Example: ^0 implement user authentication system"
+)
+
+# Unparseable caret prefix when no contexts exist (only ^0 can work)
+_NO_CONTEXTS_INVALID_PREFIX = (
+    "Invalid prefix. Use ^0 <description> to create a new context.\n"
+    "Example: ^0 implement user authentication system"
+)
+
+# Continuation formatter per in-flight mode; anything else gets the reminder
+_MODE_FORMATTERS = {
+    "pending_implementation": format_pending_plan_continuation,
+    "implementing": format_implementation_continuation,
+}
 
-@dataclass
-class CaretCommand:
+# Fixed parts of the context picker, pre-joined once
+_PICKER_HEADER = "\n".join((
+    "",
+    "+----------------------------------------------------------------+",
+    "|                   CONTEXT SELECTION REQUIRED                   |",
+    "+----------------------------------------------------------------+",
+))
+_PICKER_USAGE = "\n".join((
+    "+----------------------------------------------------------------+",
+    "|  Usage:                                                        |",
+    "|    ^S<N>                 - Select context (implementing only) |",
+    "|    ^E<N>                 - End/complete context               |",
+    "|    ^E<N>+                - End context N and all after        |",
+    "|    ^E*                   - End ALL contexts                   |",
+    "|    ^E1E2S3               - End #1 and #2, select #3           |",
+    "|    ^0 work description   - Create new context (10+ chars)     |",
+    "+----------------------------------------------------------------+",
+))
+_PICKER_NO_IMPLEMENTING = "\n".join((
+    "|  NOTE: No contexts in 'implementing' mode.                    |",
+    "|        Use ^E<N> to end old contexts, then ^0 to create new.  |",
+    "+----------------------------------------------------------------+",
+))
+
+
+class CaretCommand(NamedTuple):
     """Parsed caret command result."""
     ends: List[int]  # Context numbers to end (1-indexed)
     select: Optional[int]  # Context number to select (1-indexed), None if not specified
@@ -106,13 +169,19 @@ def parse_chained_caret(prompt: str, contexts: List["Context"]) -> Tuple[Optiona
 
     # Find where the command ends and the remaining prompt begins
     # Command is everything until first whitespace after ^
-    match = re.match(r'^\^(\S+)(?:\s+(.*))?$', prompt, re.DOTALL)
+    match = _CARET_RE.match(prompt)
     if not match:
+        if not contexts:
+            return None, _NO_CONTEXTS_INVALID_PREFIX
         return None, "Invalid prefix. Use ^E<N> to end, ^S<N> to select, or ^0 <desc> for new context."
 
     command_str = match.group(1)
     remaining = (match.group(2) or "").strip()
 
+    # With no contexts, ^0 is the only command that can succeed
+    if not contexts and not (command_str.isdigit() and int(command_str) == 0):
+        return None, _NO_CONTEXTS_HINT
+
     # Handle backwards compat: ^N where N is just a number (shorthand for ^SN)
     if command_str.isdigit():
         num = int(command_str)
@@ -129,13 +198,11 @@ def parse_chained_caret(prompt: str, contexts: List["Context"]) -> Tuple[Optiona
         else:
             # ^N - shorthand for select context N
             if num < 1 or num > len(contexts):
-                if len(contexts) == 0:
-                    return None, "No existing contexts. Use ^0 <description> to create a new one."
                 return None, f"Invalid selection. Choose 1-{len(contexts)} for existing contexts, or ^0 for new."
             # Validate context is in "implementing" mode
             ctx = contexts[num - 1]
-            if not ctx.in_flight or ctx.in_flight.mode != "implementing":
-                mode = ctx.in_flight.mode if ctx.in_flight else "none"
+            mode = ctx.in_flight.mode if ctx.in_flight else "none"
+            if mode != "implementing":
                 return None, (
                     f"Cannot select context {num} ({ctx.id}) - mode is '{mode}'.\n"
                     f"Only contexts in 'implementing' mode can be selected.\n"
@@ -144,64 +211,46 @@ def parse_chained_caret(prompt: str, contexts: List["Context"]) -> Tuple[Optiona
             return CaretCommand(ends=[], select=num, new_context_desc=None, remaining_prompt=remaining), None
 
     # Parse chained commands: E<N>, S<N>, etc.
-    ends = []
+    # Tokenized by _CMD_TOKEN_RE; tokens must be contiguous, and the first
+    # gap is reported with the same position-based errors as before
+    ends_mask = 0  # bit (N - 1) set => end context N; dedupes repeats for free
     select = None
     pos = 0
 
-    while pos < len(command_str):
-        if command_str[pos].upper() == 'E':
+    for m in _CMD_TOKEN_RE.finditer(command_str):
+        if m.start() != pos:
+            break
+        pos = m.end()
+        end_arg = m.group(1)
+
+        if end_arg is not None:
             # End command
-            pos += 1
-            # Check for wildcard (E*) - end all contexts
-            if pos < len(command_str) and command_str[pos] == '*':
-                pos += 1
-                if len(contexts) == 0:
-                    return None, "No contexts to end."
-                # Add all context numbers to ends list
-                for i in range(1, len(contexts) + 1):
-                    if i not in ends:
-                        ends.append(i)
+            if end_arg == '*':
+                # Wildcard (E*) - end all contexts
+                ends_mask = (1 << len(contexts)) - 1
+                continue
+
+            # "+" suffix means "this and all after"
+            and_after = end_arg.endswith('+')
+            num = int(end_arg[:-1] if and_after else end_arg)
+            if num < 1 or num > len(contexts):
+                return None, f"Context ^E{num} invalid. Choose 1-{len(contexts)}."
+
+            if and_after:
+                # Set num and all higher numbers (older contexts)
+                ends_mask |= ((1 << len(contexts)) - 1) & ~((1 << (num - 1)) - 1)
             else:
-                # Read number
-                num_start = pos
-                while pos < len(command_str) and command_str[pos].isdigit():
-                    pos += 1
-                if num_start == pos:
-                    return None, f"Expected number or '*' after 'E' at position {num_start + 1}"
-                num = int(command_str[num_start:pos])
-                if num < 1 or num > len(contexts):
-                    if len(contexts) == 0:
-                        return None, "No contexts to end."
-                    return None, f"Context ^E{num} invalid. Choose 1-{len(contexts)}."
-
-                # Check for + suffix meaning "this and all after"
-                if pos < len(command_str) and command_str[pos] == '+':
-                    pos += 1
-                    # Add num and all higher numbers (older contexts)
-                    for i in range(num, len(contexts) + 1):
-                        if i not in ends:
-                            ends.append(i)
-                else:
-                    ends.append(num)
-
-        elif command_str[pos].upper() == 'S':
+                ends_mask |= 1 << (num - 1)
+
+        else:
             # Select command
-            pos += 1
-            # Read number
-            num_start = pos
-            while pos < len(command_str) and command_str[pos].isdigit():
-                pos += 1
-            if num_start == pos:
-                return None, f"Expected number after 'S' at position {num_start + 1}"
-            num = int(command_str[num_start:pos])
+            num = int(m.group(2))
             if num < 1 or num > len(contexts):
-                if len(contexts) == 0:
-                    return None, "No contexts to select."
                 return None, f"Context ^S{num} invalid. Choose 1-{len(contexts)}."
             # Validate context is in "implementing" mode
             ctx = contexts[num - 1]
-            if not ctx.in_flight or ctx.in_flight.mode != "implementing":
-                mode = ctx.in_flight.mode if ctx.in_flight else "none"
+            mode = ctx.in_flight.mode if ctx.in_flight else "none"
+            if mode != "implementing":
                 return None, (
                     f"Cannot select context {num} ({ctx.id}) - mode is '{mode}'.\n"
                     f"Only contexts in 'implementing' mode can be selected.\n"
@@ -211,17 +260,25 @@ def parse_chained_caret(prompt: str, contexts: List["Context"]) -> Tuple[Optiona
             if select is None:
                 select = num
 
-        else:
-            return None, (
-                f"Invalid command '{command_str[pos]}' at position {pos + 1}.\n"
-                f"Use E<N> to end, E<N>+ to end N and after, E* to end all, S<N> to select.\n"
-                f"Example: ^E1S2 (end 1, select 2), ^E2+ (end 2 and older), ^E* (end all)"
-            )
+    if pos < len(command_str):
+        # ASCII case fold: 'E'/'e' -> 0x65, 'S'/'s' -> 0x73
+        op = ord(command_str[pos]) | 0x20
+        if op == 0x65:
+            return None, f"Expected number or '*' after 'E' at position {pos + 2}"
+        if op == 0x73:
+            return None, f"Expected number after 'S' at position {pos + 2}"
+        return None, (
+            f"Invalid command '{command_str[pos]}' at position {pos + 1}.\n"
+            f"Use E<N> to end, E<N>+ to end N and after, E* to end all, S<N> to select.\n"
+            f"Example: ^E1S2 (end 1, select 2), ^E2+ (end 2 and older), ^E* (end all)"
+        )
 
     # Validate: can't select a context that's being ended
-    if select is not None and select in ends:
+    if select is not None and (ends_mask >> (select - 1)) & 1:
         return None, f"Cannot select context {select} because it's being ended."
 
+    ends = [i for i in range(1, len(contexts) + 1) if (ends_mask >> (i - 1)) & 1]
+
     return CaretCommand(ends=ends, select=select, new_context_desc=None, remaining_prompt=remaining), None
 
 
@@ -242,57 +299,45 @@ def format_context_picker_stderr(contexts: List[Context]) -> str:
     Returns:
         Formatted picker message
     """
-    lines = [
-        "",
-        "+----------------------------------------------------------------+",
-        "|                   CONTEXT SELECTION REQUIRED                   |",
-        "+----------------------------------------------------------------+",
-    ]
+    lines = [_PICKER_HEADER]
 
     implementing_count = 0
     for i, ctx in enumerate(contexts, 1):
         time_str = _format_relative_time(ctx.last_active)
 
+        in_flight = ctx.in_flight
+        mode = in_flight.mode if in_flight else None
+
         # Check if context is in implementing mode (selectable)
-        is_implementing = ctx.in_flight and ctx.in_flight.mode == "implementing"
+        is_implementing = mode == "implementing"
         if is_implementing:
             implementing_count += 1
 
         # Add status indicator for in-flight work
         status = ""
-        if ctx.in_flight and ctx.in_flight.mode != "none":
-            mode_display = get_mode_display(ctx.in_flight.mode)
+        if mode and mode != "none":
+            mode_display = get_mode_display(mode)
             if mode_display:
                 status = f" {mode_display}"
 
         # Truncate summary for display
-        summary = ctx.summary[:45] + "..." if len(ctx.summary) > 48 else ctx.summary
+        summary = ctx.summary
+        if len(summary) > 48:
+            summary = summary[:45] + "..."
 
-        # Show selectable indicator
+        # Show selectable indicator; one pre-joined block per context
         selectable = " [selectable]" if is_implementing else " [end only]"
-        lines.append(f"|  ^{i}  {ctx.id}{status}{selectable}")
-        lines.append(f"|       {summary}")
-        lines.append(f"|       [{time_str}]")
-        lines.append("|")
-
-    lines.extend([
-        "+----------------------------------------------------------------+",
-        "|  Usage:                                                        |",
-        "|    ^S<N>                 - Select context (implementing only) |",
-        "|    ^E<N>                 - End/complete context               |",
-        "|    ^E<N>+                - End context N and all after        |",
-        "|    ^E*                   - End ALL contexts                   |",
-        "|    ^E1E2S3               - End #1 and #2, select #3           |",
-        "|    ^0 work description   - Create new context (10+ chars)     |",
-        "+----------------------------------------------------------------+",
-    ])
+        lines.append(
+            f"|  ^{i}  {ctx.id}{status}{selectable}\n"
+            f"|       {summary}\n"
+            f"|       [{time_str}]\n"
+            f"|"
+        )
+
+    lines.append(_PICKER_USAGE)
 
     if implementing_count == 0:
-        lines.extend([
-            "|  NOTE: No contexts in 'implementing' mode.                    |",
-            "|        Use ^E<N> to end old contexts, then ^0 to create new.  |",
-            "+----------------------------------------------------------------+",
-        ])
+        lines.append(_PICKER_NO_IMPLEMENTING)
 
     lines.append("")
 
@@ -316,7 +361,10 @@ def format_command_feedback(ended_contexts: List[Context], selected_context: Opt
         lines.append("## Contexts Ended")
         lines.append("")
         for ctx in ended_contexts:
-            lines.append(f"- **{ctx.id}**: {ctx.summary[:50]}{'...' if len(ctx.summary) > 50 else ''}")
+            summary = ctx.summary
+            if len(summary) > 50:
+                summary = summary[:50] + "..."
+            lines.append(f"- **{ctx.id}**: {summary}")
         lines.append("")
 
     if selected_context:
@@ -326,8 +374,10 @@ def format_command_feedback(ended_contexts: List[Context], selected_context: Opt
 
         # Build mode display
         mode_display = "Active"
-        if selected_context.in_flight and selected_context.in_flight.mode != "none":
-            mode_str = get_mode_display(selected_context.in_flight.mode)
+        in_flight = selected_context.in_flight
+        mode = in_flight.mode if in_flight else None
+        if mode and mode != "none":
+            mode_str = get_mode_display(mode)
             if mode_str:
                 mode_display = mode_str.strip("[]")
 
@@ -361,15 +411,20 @@ def determine_context(
     """
     # 0. Skip context creation for internal subprocess calls (orchestrator, agents)
     if is_internal_call():
-        eprint("[context_enforcer] Skipping: internal subprocess call")
+        if _DEBUG:
+            eprint("[context_enforcer] Skipping: internal subprocess call")
         return (None, "skip_internal", None)
 
+    # Load active contexts once; reused by the session match and caret paths
+    contexts = get_all_contexts(status="active", project_root=project_root)
+
     # 1. Check if session already belongs to a context (HIGHEST PRIORITY)
     # This prevents context switching on subsequent prompts - one context per session
     if session_id:
-        session_context = get_context_by_session_id(session_id, project_root)
+        session_context = get_context_by_session_id(session_id, project_root, contexts)
         if session_context:
-            eprint(f"[context_enforcer] Session already in context: {session_context.id}")
+            if _DEBUG:
+                eprint(f"[context_enforcer] Session already in context: {session_context.id}")
             return (
                 session_context.id,
                 "session_match",
@@ -378,7 +433,6 @@ def determine_context(
 
     # 2. Check for bare "^" - show context picker
     if user_prompt.strip() == "^":
-        contexts = get_all_contexts(status="active", project_root=project_root)
         if not contexts:
             raise BlockRequest(
                 "No contexts exist.\n\n"
@@ -389,24 +443,20 @@ def determine_context(
 
     # 3. Check for explicit caret commands (^E, ^S, ^0, ^N)
     if user_prompt.startswith("^"):
-        contexts = get_all_contexts(status="active", project_root=project_root)
         return _handle_caret_command(user_prompt, contexts, project_root)
 
     # 4. No caret prefix - check in-flight contexts for auto-selection
-    in_flight_contexts = get_all_in_flight_contexts(project_root)
+    # (filtered from the list loaded above - no second read of the store)
+    in_flight_contexts = get_all_in_flight_contexts(project_root, contexts)
 
     if len(in_flight_contexts) == 0:
         # No in-flight work - auto-create new context from prompt
 
-        # Skip auto-creation for certain prompts that don't represent work
-        skip_patterns = [
-            "/help", "/clear", "/status", "hello", "hi", "hey",
-            "thanks", "thank you", "bye", "goodbye"
-        ]
-        prompt_lower = user_prompt.lower().strip()
-
         # Don't auto-create for greetings or help commands
-        if any(prompt_lower.startswith(p) or prompt_lower == p for p in skip_patterns):
+        # (str.startswith with a tuple also covers exact matches; only the
+        # head of the prompt can match, so don't lower-case all of it)
+        prompt_head = user_prompt.lstrip()[:_SKIP_PREFIX_SCAN_LEN].lower()
+        if prompt_head.startswith(SKIP_AUTO_CREATE_PREFIXES):
             return (None, "no_context_needed", None)
 
         # Auto-create context from prompt
@@ -415,7 +465,8 @@ def determine_context(
             # Set to implementing mode so it can be selected
             update_plan_status(new_context.id, "implementing", project_root=project_root)
             new_context.in_flight.mode = "implementing"  # Update local copy for display
-            eprint(f"[context_enforcer] Auto-created new context: {new_context.id}")
+            if _DEBUG:
+                eprint(f"[context_enforcer] Auto-created new context: {new_context.id}")
             return (
                 new_context.id,
                 "auto_created",
@@ -429,21 +480,18 @@ def determine_context(
         # Single in-flight context - auto-select it
         ctx = in_flight_contexts[0]
         mode = ctx.in_flight.mode if ctx.in_flight else "none"
-        eprint(f"[context_enforcer] Auto-selected single in-flight context: {ctx.id} (mode={mode})")
+        if _DEBUG:
+            eprint(f"[context_enforcer] Auto-selected single in-flight context: {ctx.id} (mode={mode})")
 
         # Use mode-specific formatter for better continuation context
-        if mode == "pending_implementation":
-            output = format_pending_plan_continuation(ctx)
-        elif mode == "implementing":
-            output = format_implementation_continuation(ctx)
-        else:
-            output = format_active_context_reminder(ctx)
+        output = _MODE_FORMATTERS.get(mode, format_active_context_reminder)(ctx)
 
         return (ctx.id, "auto_selected", output)
 
     else:
         # Multiple in-flight contexts - block and show picker
-        eprint(f"[context_enforcer] Multiple in-flight contexts ({len(in_flight_contexts)}), showing picker")
+        if _DEBUG:
+            eprint(f"[context_enforcer] Multiple in-flight contexts ({len(in_flight_contexts)}), showing picker")
         raise BlockRequest(
             f"Multiple contexts have in-flight work ({len(in_flight_contexts)} active).\n"
             "Select one to continue, or use ^ to see all contexts:\n" +
@@ -470,38 +518,20 @@ def _handle_caret_command(
     Raises:
         BlockRequest: When command is invalid or selection needed
     """
-    # No contexts case - only ^0 is valid
-    if not contexts:
-        match = re.match(r'^\^(\S+)(?:\s+(.*))?$', user_prompt, re.DOTALL)
-        if not match:
-            raise BlockRequest(
-                "Invalid prefix. Use ^0 <description> to create a new context.\n"
-                "Example: ^0 implement user authentication system"
-            )
-
-        prefix_value = match.group(1)
-        remaining = match.group(2) or ""
-
-        # Must be ^0 for new context
-        if not prefix_value.isdigit() or int(prefix_value) != 0:
-            raise BlockRequest(
-                f"No existing contexts to select. Use ^0 <description> to create a new context.\n"
-                f"Example: ^0 implement user authentication system"
-            )
+    # Parse caret commands
+    cmd, error = parse_chained_caret(user_prompt, contexts)
 
-        description = remaining.strip()
-        if len(description) < MIN_NEW_CONTEXT_CHARS:
-            raise BlockRequest(
-                f"Please provide a longer description for your new context.\n"
-                f"Your description '{description}' is only {len(description)} characters.\n"
-                f"Minimum required: {MIN_NEW_CONTEXT_CHARS} characters.\n"
-                f"Example: ^0 implement user authentication with JWT tokens"
-            )
+    # No contexts case - only ^0 is valid (the parser rejects everything else)
+    if not contexts:
+        if error or not cmd or not cmd.new_context_desc:
+            raise BlockRequest(error or _NO_CONTEXTS_HINT)
+        description = cmd.new_context_desc
         try:
             new_context = create_context_from_prompt(description, project_root)
             update_plan_status(new_context.id, "implementing", project_root=project_root)
             new_context.in_flight.mode = "implementing"
-            eprint(f"[context_enforcer] Created context from ^0: {new_context.id}")
+            if _DEBUG:
+                eprint(f"[context_enforcer] Created context from ^0: {new_context.id}")
             return (
                 new_context.id,
                 "caret_new",
@@ -511,9 +541,6 @@ def _handle_caret_command(
             eprint(f"[context_enforcer] Failed to create context: {e}")
             raise BlockRequest(f"Failed to create context: {e}")
 
-    # Parse caret commands
-    cmd, error = parse_chained_caret(user_prompt, contexts)
-
     if error:
         raise BlockRequest(error + "\n" + format_context_picker_stderr(contexts))
 
@@ -524,12 +551,13 @@ def _handle_caret_command(
     # Process chained commands
     ended_contexts = []
 
-    # End specified contexts
-    for end_num in cmd.ends:
-        ctx_to_end = contexts[end_num - 1]  # 1-indexed
-        complete_context(ctx_to_end.id, project_root)
-        ended_contexts.append(ctx_to_end)
-        eprint(f"[context_enforcer] Ended context: {ctx_to_end.id}")
+    # End specified contexts (one batch, so the indexes are rewritten once)
+    if cmd.ends:
+        ended_contexts = [contexts[end_num - 1] for end_num in cmd.ends]  # 1-indexed
+        complete_contexts([c.id for c in ended_contexts], project_root)
+        if _DEBUG:
+            for ctx_to_end in ended_contexts:
+                eprint(f"[context_enforcer] Ended context: {ctx_to_end.id}")
 
     # Handle new context creation
     if cmd.new_context_desc:
@@ -537,7 +565,8 @@ def _handle_caret_command(
             new_context = create_context_from_prompt(cmd.new_context_desc, project_root)
             update_plan_status(new_context.id, "implementing", project_root=project_root)
             new_context.in_flight.mode = "implementing"
-            eprint(f"[context_enforcer] Created context from ^0: {new_context.id}")
+            if _DEBUG:
+                eprint(f"[context_enforcer] Created context from ^0: {new_context.id}")
             output = format_command_feedback(ended_contexts, new_context)
             return (
                 new_context.id,
@@ -551,7 +580,8 @@ def _handle_caret_command(
     # Handle context selection
     if cmd.select:
         selected_ctx = contexts[cmd.select - 1]  # 1-indexed
-        eprint(f"[context_enforcer] Caret-selected context: {selected_ctx.id}")
+        if _DEBUG:
+            eprint(f"[context_enforcer] Caret-selected context: {selected_ctx.id}")
         output = format_command_feedback(ended_contexts, selected_ctx)
         return (
             selected_ctx.id,
@@ -559,9 +589,11 @@ def _handle_caret_command(
             output
         )
 
-    # Only ended contexts, no selection - refresh context list and block
+    # Only ended contexts, no selection - drop the ended ones and block
+    # (completed contexts leave the active set, so no need to re-read it)
     if ended_contexts:
-        remaining_contexts = get_all_contexts(status="active", project_root=project_root)
+        ended_ids = {c.id for c in ended_contexts}
+        remaining_contexts = [c for c in contexts if c.id not in ended_ids]
         feedback = format_command_feedback(ended_contexts, None)
         if not remaining_contexts:
             raise BlockRequest(
@@ -587,6 +619,9 @@ def main():
 
     In production, use user_prompt_submit.py as the unified entry point.
     """
+    # Only the standalone entry point parses stdin; importers don't need json
+    import json
+
     try:
         input_data = sys.stdin.read().strip()
         if not input_data:
@@ -601,7 +636,8 @@ def main():
 
         try:
             context_id, method, output = determine_context(user_prompt, project_root)
-            eprint(f"[context_enforcer] Method: {method}, Context: {context_id}")
+            if _DEBUG:
+                eprint(f"[context_enforcer] Method: {method}, Context: {context_id}")
 
             if output:
                 print(output)
@@ -614,7 +650,7 @@ def main():
     except Exception as e:
         eprint(f"[context_enforcer] ERROR: {e}")
         import traceback
-        eprint(traceback.format_exc())
+        traceback.print_exc(file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -46,21 +46,21 @@ to compensate (~22.6k tokens typical). See:
 https://github.com/anthropics/claude-code/issues/13783
 """
 import json
+import os
 import sys
 from pathlib import Path
 from typing import Optional, Tuple
 
 # Add parent directories to path for imports
-SCRIPT_DIR = Path(__file__).resolve().parent
-SHARED_LIB = SCRIPT_DIR.parent / "lib"
-sys.path.insert(0, str(SHARED_LIB.parent))
+_SHARED_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SHARED_ROOT not in sys.path:
+    sys.path.insert(0, _SHARED_ROOT)
 
 from lib.base.utils import eprint, project_dir
-from lib.context.context_manager import (
-    get_all_contexts,
-    get_context_by_session_id,
-    update_plan_status,
-)
+
+# lib.context.context_manager is imported inside the functions that need it:
+# most calls are a non-implementation tool with plenty of context left and
+# never touch the context store
 
 # Configuration
 LOW_CONTEXT_THRESHOLD = 40  # Warn when below 40% remaining
@@ -73,6 +73,47 @@ CONTEXT_BASELINE = 22_600
 # Default context window size (used when not provided in hook input)
 DEFAULT_CONTEXT_WINDOW = 200_000
 
+# current_usage fields that together make up the context content
+USAGE_TOKEN_KEYS = (
+    "cache_read_input_tokens",
+    "input_tokens",
+    "cache_creation_input_tokens",
+    "output_tokens",
+)
+
+# Tools that indicate implementation work (trigger mode transitions)
+IMPLEMENTATION_TOOLS = frozenset({"Edit", "Write", "Bash", "NotebookEdit"})
+
+# In-flight modes that can transition to implementing
+TRANSITION_FROM_MODES = frozenset({"pending_implementation", "planning"})
+
+# Low-context system reminder (filled in by get_context_warning)
+WARNING_TEMPLATE = """<system-reminder>
+## {urgency} CONTEXT WARNING ({percent_remaining}% remaining)
+
+**Estimated usage**: ~{tokens_used_k}k / {max_tokens_k}k tokens
+**Triggered by**: {tool_name} tool completion
+
+{instruction}
+{context_info}
+
+**Actions:**
+1. Complete your current atomic task (if 1-2 steps away)
+2. Do NOT start new multi-step work
+3. Create a handoff document summarizing progress
+4. Ask user: "Context is getting low. I've summarized my progress. Should we continue in a new session?"
+</system-reminder>"""
+
+# Handoff hint added to the warning when there is an active context
+HANDOFF_INFO_TEMPLATE = """
+To create a handoff document, use the /handoff command or describe:
+- What you were working on
+- What's completed
+- What still needs to be done
+- Any important decisions or context
+
+Context ID: `{context_id}`"""
+
 
 def get_context_tokens_from_hook(hook_input: dict) -> Tuple[Optional[int], Optional[int]]:
     """
@@ -98,13 +139,8 @@ def get_context_tokens_from_hook(hook_input: dict) -> Tuple[Optional[int], Optio
     if not current_usage:
         return None, None
 
-    # Sum all token types
-    cache_read = current_usage.get("cache_read_input_tokens", 0) or 0
-    input_tokens = current_usage.get("input_tokens", 0) or 0
-    cache_creation = current_usage.get("cache_creation_input_tokens", 0) or 0
-    output_tokens = current_usage.get("output_tokens", 0) or 0
-
-    content_tokens = cache_read + input_tokens + cache_creation + output_tokens
+    # Sum all token types (missing or null counts as 0)
+    content_tokens = sum(current_usage.get(key) or 0 for key in USAGE_TOKEN_KEYS)
 
     # Add baseline for system prompt, tools, MCP tokens not in hook data
     tokens_used = content_tokens + CONTEXT_BASELINE
@@ -124,6 +160,8 @@ def get_current_context_id(project_root: Path = None) -> Optional[str]:
     Returns:
         Context ID or None if no active context
     """
+    from lib.context.context_manager import get_all_contexts
+
     contexts = get_all_contexts(status="active", project_root=project_root)
     if contexts:
         return contexts[0].id  # Sorted by last_active desc
@@ -161,35 +199,20 @@ def get_context_warning(
         urgency = "LOW"
         instruction = "Please wrap up your current task and prepare for handoff."
 
-    context_info = ""
-    if context_id:
-        context_info = f"""
-To create a handoff document, use the /handoff command or describe:
-- What you were working on
-- What's completed
-- What still needs to be done
-- Any important decisions or context
-
-Context ID: `{context_id}`"""
-
-    return f"""<system-reminder>
-## {urgency} CONTEXT WARNING ({percent_remaining}% remaining)
-
-**Estimated usage**: ~{tokens_used_k}k / {max_tokens_k}k tokens
-**Triggered by**: {tool_name} tool completion
-
-{instruction}
-{context_info}
+    context_info = HANDOFF_INFO_TEMPLATE.format(context_id=context_id) if context_id else ""
 
-**Actions:**
-1. Complete your current atomic task (if 1-2 steps away)
-2. Do NOT start new multi-step work
-3. Create a handoff document summarizing progress
-4. Ask user: "Context is getting low. I've summarized my progress. Should we continue in a new session?"
-</system-reminder>"""
+    return WARNING_TEMPLATE.format(
+        urgency=urgency,
+        percent_remaining=percent_remaining,
+        tokens_used_k=tokens_used_k,
+        max_tokens_k=max_tokens_k,
+        tool_name=tool_name,
+        instruction=instruction,
+        context_info=context_info,
+    )
 
 
-def check_and_transition_mode(hook_input: dict) -> None:
+def check_and_transition_mode(hook_input: dict, project_root: Optional[Path] = None) -> None:
     """
     Check if context needs to transition to implementing mode.
 
@@ -205,20 +228,34 @@ def check_and_transition_mode(hook_input: dict) -> None:
 
     Args:
         hook_input: Hook input data from Claude Code
+        project_root: Project root directory (resolved from hook_input if None)
     """
-    # Only transition on tools that indicate implementation work
-    implementation_tools = {"Edit", "Write", "Bash", "NotebookEdit"}
-    tool_name = hook_input.get("tool_name", "")
-
-    if tool_name not in implementation_tools:
+    # Only transition on tools that indicate implementation work; checked
+    # before project_dir() or any context store access
+    if hook_input.get("tool_name") not in IMPLEMENTATION_TOOLS:
         return
 
-    project_root = project_dir(hook_input)
     session_id = hook_input.get("session_id")
 
     if not session_id:
         return
 
+    if project_root is None:
+        project_root = project_dir(hook_input)
+
+    from lib.context.context_manager import (
+        get_context_by_session_id,
+        get_session_in_flight_mode,
+        update_plan_status,
+    )
+
+    # The index already knows the bound context's mode; once it's past
+    # planning/pending_implementation there is nothing to transition, so
+    # skip loading the context (the common case on every later Edit/Write)
+    indexed_mode = get_session_in_flight_mode(session_id, project_root)
+    if indexed_mode is not None and indexed_mode not in TRANSITION_FROM_MODES:
+        return
+
     # Get context for this session
     context = get_context_by_session_id(session_id, project_root)
     if not context:
@@ -241,7 +278,7 @@ def check_and_transition_mode(hook_input: dict) -> None:
         update_plan_status(context.id, "implementing", project_root=project_root)
 
 
-def check_context_level(hook_input: dict) -> Optional[str]:
+def check_context_level(hook_input: dict, project_root: Optional[Path] = None) -> Optional[str]:
     """
     Check context level and return warning if low.
 
@@ -249,6 +286,7 @@ def check_context_level(hook_input: dict) -> Optional[str]:
 
     Args:
         hook_input: Hook input data from Claude Code
+        project_root: Project root directory (resolved from hook_input if None)
 
     Returns:
         System reminder string if context is low, None otherwise
@@ -279,7 +317,8 @@ def check_context_level(hook_input: dict) -> Optional[str]:
            f"(~{tokens_used//1000}k/{max_tokens//1000}k tokens)")
 
     # Get current context for handoff info (file I/O)
-    project_root = project_dir(hook_input)
+    if project_root is None:
+        project_root = project_dir(hook_input)
     context_id = get_current_context_id(project_root)
 
     tool_name = hook_input.get("tool_name", "Unknown")
@@ -301,23 +340,27 @@ def main():
     and prints system reminder if context is low.
     """
     try:
-        # Read hook input from stdin
-        input_data = sys.stdin.read().strip()
+        # Read hook input as bytes: json.loads detects the encoding itself,
+        # so skip the text-mode decode and a stripped copy of the payload
+        input_data = sys.stdin.buffer.read()
 
-        if not input_data:
+        if not input_data or input_data.isspace():
             return
 
         try:
             hook_input = json.loads(input_data)
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, UnicodeDecodeError):
             return
 
+        # Resolved once and shared by both checks
+        project_root = project_dir(hook_input)
+
         # Always check for mode transitions on implementation tools
         # This handles the case where /clear pastes the plan with non-plan permission mode
-        check_and_transition_mode(hook_input)
+        check_and_transition_mode(hook_input, project_root)
 
         # Check context level
-        warning = check_context_level(hook_input)
+        warning = check_context_level(hook_input, project_root)
 
         if warning:
             # Output JSON with additionalContext so Claude sees the warning
@@ -328,12 +371,14 @@ def main():
                     "additionalContext": warning
                 }
             }
-            print(json.dumps(output))
+            # Compact JSON, one write + flush: the warning is several KB over a pipe
+            sys.stdout.write(json.dumps(output, separators=(",", ":")) + "\n")
+            sys.stdout.flush()
 
     except Exception as e:
         eprint(f"[context_monitor] ERROR: {e}")
         import traceback
-        eprint(traceback.format_exc())
+        traceback.print_exc(file=sys.stderr)
 
 
 if __name__ == "__main__":
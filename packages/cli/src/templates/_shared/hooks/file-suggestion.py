@@ -18,29 +18,81 @@ Hook output:
 JSON array of file paths to suggest, or empty array if no suggestions.
 ["/path/to/file1.md", "/path/to/file2.md"]
 """
+import heapq
 import json
+import os
 import sys
 from pathlib import Path
 from typing import List, Optional
 
 # Add parent directories to path for imports
-SCRIPT_DIR = Path(__file__).resolve().parent
-SHARED_LIB = SCRIPT_DIR.parent / "lib"
-sys.path.insert(0, str(SHARED_LIB.parent))
+_SHARED_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SHARED_ROOT not in sys.path:
+    sys.path.insert(0, _SHARED_ROOT)
 
 from lib.base.utils import eprint, project_dir
-from lib.base.constants import (
-    get_context_plans_dir,
-    get_context_handoffs_dir,
-    get_context_reviews_dir,
-    get_context_file_path,
-)
+from lib.base.constants import get_context_dir
 from lib.context.context_manager import (
     get_context_by_session_id,
-    get_all_in_flight_contexts,
+    iter_in_flight_contexts,
     get_context,
 )
 
+# Limit suggestions to prevent overwhelming the context
+MAX_SUGGESTIONS = 10
+
+
+def _md_files_newest_first(directory: Path, limit: Optional[int] = None) -> List[str]:
+    """
+    List the *.md files in a directory, most recently modified first.
+
+    Uses os.scandir so each mtime comes from the DirEntry rather than a
+    separate stat() per path. Matches glob("*.md"): hidden files are
+    skipped and the suffix check is case-insensitive only on Windows.
+
+    Args:
+        directory: Directory to list
+        limit: Return at most this many (top-K selection instead of a full sort)
+
+    Returns:
+        File paths as strings, or an empty list if the directory is missing
+    """
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                name = entry.name
+                if (name.startswith(".") or not os.path.normcase(name).endswith(".md")
+                        or not entry.is_file()):
+                    continue
+                entries.append((entry.stat().st_mtime, entry.path))
+    except OSError:
+        return []
+
+    if limit is not None:
+        entries = heapq.nlargest(limit, entries, key=lambda e: e[0])
+    else:
+        entries.sort(key=lambda e: e[0], reverse=True)
+    return [path for _, path in entries]
+
+
+def _newest_subdir_name(directory: Path) -> Optional[str]:
+    """
+    Name of the newest dated subdirectory (folders are named YYYY-MM-DD-HHMM...,
+    so the lexically greatest name is the most recent).
+
+    Args:
+        directory: Directory to look in
+
+    Returns:
+        Subdirectory name, or None if there are none (or the directory is missing)
+    """
+    try:
+        with os.scandir(directory) as it:
+            return max((entry.name for entry in it if entry.is_dir()), default=None)
+    except OSError:
+        return None
+
 
 def get_context_files(context_id: str, project_root: Path) -> List[str]:
     """
@@ -61,61 +113,64 @@ def get_context_files(context_id: str, project_root: Path) -> List[str]:
     """
     files = []
 
+    # Validate/resolve the context folder once and list it once: the entries
+    # present stand in for separate exists() probes on each child
+    context_dir = get_context_dir(context_id, project_root)
+    try:
+        with os.scandir(context_dir) as it:
+            present = {entry.name for entry in it}
+    except OSError:
+        return files
+
     # Get context.json file first
-    context_file = get_context_file_path(context_id, project_root)
-    if context_file.exists():
-        files.append(str(context_file))
+    if "context.json" in present:
+        files.append(str(context_dir / "context.json"))
         eprint(f"[file-suggestion] Found context file for {context_id}")
 
     # Get plans directory
-    plans_dir = get_context_plans_dir(context_id, project_root)
-    if plans_dir.exists():
-        plan_files = list(plans_dir.glob("*.md"))
-        # Sort by modification time, most recent first
-        plan_files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-        files.extend([str(p) for p in plan_files])
-        eprint(f"[file-suggestion] Found {len(plan_files)} plans in {context_id}")
+    if "plans" in present:
+        # Anything past the overall cap would be cut in main(), so only keep the newest
+        plan_files = _md_files_newest_first(context_dir / "plans", limit=max(0, MAX_SUGGESTIONS - len(files)))
+        if plan_files:
+            files.extend(plan_files)
+            eprint(f"[file-suggestion] Found {len(plan_files)} plans in {context_id}")
+
+    # Handoffs and reviews come after the plans, so once the cap is reached
+    # main() would cut them anyway - skip listing their folders
+    if len(files) >= MAX_SUGGESTIONS:
+        return files
 
     # Get handoffs - prefer folder-based (index.md in subdirectories), fall back to legacy
-    handoffs_dir = get_context_handoffs_dir(context_id, project_root)
-    if handoffs_dir.exists():
+    if "handoffs" in present:
+        handoffs_dir = context_dir / "handoffs"
         # Find handoff folders (named like YYYY-MM-DD-HHMM or YYYY-MM-DD-HHMM-N)
-        handoff_folders = sorted(
-            [d for d in handoffs_dir.iterdir() if d.is_dir()],
-            key=lambda d: d.name,
-            reverse=True  # Most recent first (alphabetically sorts by date)
-        )
+        newest_handoff = _newest_subdir_name(handoffs_dir)
 
-        if handoff_folders:
+        if newest_handoff:
             # Use folder-based: get index.md from most recent folder only
-            index_file = handoff_folders[0] / "index.md"
+            index_file = handoffs_dir / newest_handoff / "index.md"
             if index_file.exists():
                 files.append(str(index_file))
-                eprint(f"[file-suggestion] Found handoff folder: {handoff_folders[0].name}")
+                eprint(f"[file-suggestion] Found handoff folder: {newest_handoff}")
         else:
             # Legacy support: flat .md files directly in handoffs/
-            legacy_handoffs = [f for f in handoffs_dir.glob("*.md") if f.is_file()]
-            legacy_handoffs.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+            legacy_handoffs = _md_files_newest_first(handoffs_dir, limit=1)
             if legacy_handoffs:
-                files.append(str(legacy_handoffs[0]))  # Only most recent legacy
-                eprint(f"[file-suggestion] Found {len(legacy_handoffs)} legacy handoffs in {context_id}")
+                files.append(legacy_handoffs[0])  # Only most recent legacy
+                eprint(f"[file-suggestion] Found legacy handoff in {context_id}")
 
     # Get reviews - prefer folder-based (index.md in subdirectories), fall back to legacy
-    reviews_dir = get_context_reviews_dir(context_id, project_root) / "cc-native"
-    if reviews_dir.exists():
+    reviews_dir = context_dir / "reviews" / "cc-native"
+    if "reviews" in present and reviews_dir.exists():
         # Find review folders (named like YYYY-MM-DD-HHMM-iteration-N)
-        review_folders = sorted(
-            [d for d in reviews_dir.iterdir() if d.is_dir()],
-            key=lambda d: d.name,
-            reverse=True  # Most recent first
-        )
+        newest_review = _newest_subdir_name(reviews_dir)
 
-        if review_folders:
+        if newest_review:
             # Use folder-based: get index.md from most recent folder only
-            index_file = review_folders[0] / "index.md"
+            index_file = reviews_dir / newest_review / "index.md"
             if index_file.exists():
                 files.append(str(index_file))
-                eprint(f"[file-suggestion] Found review folder: {review_folders[0].name}")
+                eprint(f"[file-suggestion] Found review folder: {newest_review}")
         else:
             # Legacy support: flat review.md directly in cc-native/
             legacy_review = reviews_dir / "review.md"
@@ -149,13 +204,14 @@ def get_active_context_id(session_id: str, project_root: Path) -> Optional[str]:
             eprint(f"[file-suggestion] Found context by session: {context.id}")
             return context.id
 
-    # Fall back to single in-flight context
-    in_flight = get_all_in_flight_contexts(project_root)
-    if len(in_flight) == 1:
-        eprint(f"[file-suggestion] Using single in-flight context: {in_flight[0].id}")
-        return in_flight[0].id
+    # Fall back to single in-flight context; stop loading at the second one
+    in_flight = iter_in_flight_contexts(project_root)
+    first = next(in_flight, None)
+    if first and next(in_flight, None) is None:
+        eprint(f"[file-suggestion] Using single in-flight context: {first.id}")
+        return first.id
 
-    eprint(f"[file-suggestion] No unique context found (in-flight: {len(in_flight)})")
+    eprint(f"[file-suggestion] No unique context found (in-flight: {'none' if first is None else 'several'})")
     return None
 
 
@@ -167,16 +223,16 @@ def main():
     and outputs file suggestions as JSON array.
     """
     try:
-        # Read hook input from stdin
-        input_data = sys.stdin.read().strip()
+        # Read hook input as bytes: json.loads detects the encoding itself
+        input_data = sys.stdin.buffer.read()
 
-        if not input_data:
+        if not input_data or input_data.isspace():
             print("[]")
             return
 
         try:
             hook_input = json.loads(input_data)
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, UnicodeDecodeError):
             eprint("[file-suggestion] Failed to parse input JSON")
             print("[]")
             return
@@ -197,20 +253,18 @@ def main():
         # Collect file suggestions
         suggestions = get_context_files(context_id, project_root)
 
-        # Limit suggestions to prevent overwhelming the context
-        MAX_SUGGESTIONS = 10
         if len(suggestions) > MAX_SUGGESTIONS:
             eprint(f"[file-suggestion] Limiting suggestions to {MAX_SUGGESTIONS} (was {len(suggestions)})")
             suggestions = suggestions[:MAX_SUGGESTIONS]
 
         # Output suggestions as JSON array
         eprint(f"[file-suggestion] Suggesting {len(suggestions)} files")
-        print(json.dumps(suggestions))
+        sys.stdout.write(json.dumps(suggestions) + "\n")
 
     except Exception as e:
         eprint(f"[file-suggestion] ERROR: {e}")
         import traceback
-        eprint(traceback.format_exc())
+        traceback.print_exc(file=sys.stderr)
         print("[]")
 
 
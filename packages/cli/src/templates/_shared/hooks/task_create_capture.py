@@ -24,82 +24,19 @@ Hook output:
 - Logs to stderr for debugging
 """
 import json
+import os
 import sys
-from pathlib import Path
-from typing import Optional, Dict, Any
 
 # Add parent directories to path for imports
-SCRIPT_DIR = Path(__file__).resolve().parent
-SHARED_LIB = SCRIPT_DIR.parent / "lib"
-sys.path.insert(0, str(SHARED_LIB.parent))
+_SHARED_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SHARED_ROOT not in sys.path:
+    sys.path.insert(0, _SHARED_ROOT)
 
 from lib.context.task_sync import record_task_created, generate_next_task_id
-from lib.context.context_manager import get_all_contexts, get_context_by_session_id
+from lib.context.context_manager import resolve_context_id
 from lib.base.utils import eprint, project_dir
 
 
-def extract_context_id(
-    tool_input: Dict[str, Any],
-    project_root: Path,
-    session_id: Optional[str] = None
-) -> Optional[str]:
-    """
-    Extract context ID from tool input metadata, session, or active contexts.
-
-    Priority:
-    1. metadata.context field
-    2. Session ID lookup (session bound to context)
-    3. metadata.persistent_id prefix (e.g., "ctx-123-task-1" -> "ctx-123")
-    4. Single active context
-    5. None (will trigger auto-creation)
-
-    Args:
-        tool_input: Tool input from TaskCreate
-        project_root: Project root directory
-        session_id: Session ID from hook payload
-
-    Returns:
-        Context ID or None if cannot determine
-    """
-    # Check metadata.context field
-    metadata = tool_input.get("metadata", {})
-    if isinstance(metadata, dict):
-        context = metadata.get("context")
-        if context:
-            return context
-
-    # Check session ID - session may be bound to a context
-    if session_id:
-        try:
-            session_context = get_context_by_session_id(session_id, project_root)
-            if session_context:
-                eprint(f"[task_create_capture] Found context via session_id: {session_context.id}")
-                return session_context.id
-        except Exception as e:
-            eprint(f"[task_create_capture] Failed to lookup context by session: {e}")
-
-    # Check persistent_id for context hint
-    if isinstance(metadata, dict):
-        persistent_id = metadata.get("persistent_id", "")
-        if persistent_id and "-" in persistent_id:
-            # Format: "context-id-task-1" or similar
-            parts = persistent_id.split("-")
-            if len(parts) >= 2:
-                # Reconstruct context ID (everything before last two parts)
-                context_parts = parts[:-2] if len(parts) > 2 else parts[:1]
-                return "-".join(context_parts)
-
-    # Check for single active context
-    try:
-        contexts = get_all_contexts(status="active", project_root=project_root)
-        if len(contexts) == 1:
-            return contexts[0].id
-    except Exception as e:
-        eprint(f"[task_create_capture] Failed to get active contexts: {e}")
-
-    return None
-
-
 def main() -> int:
     """
     Main hook entry point.
@@ -108,8 +45,15 @@ def main() -> int:
         0 on success, non-zero on failure (but hook is non-blocking)
     """
     try:
+        # Read hook input as bytes; a payload that never mentions the tool
+        # can't be a TaskCreate event, so skip parsing it (tool_response can
+        # be large)
+        input_data = sys.stdin.buffer.read()
+        if b'"TaskCreate"' not in input_data:
+            return 0
+
         # Parse hook input
-        payload = json.load(sys.stdin)
+        payload = json.loads(input_data)
 
         # Validate hook type
         if payload.get("hook_event_name") != "PostToolUse":
@@ -142,7 +86,7 @@ def main() -> int:
         session_id = payload.get("session_id")
 
         # Extract context ID
-        context_id = extract_context_id(tool_input, project_root, session_id)
+        context_id = resolve_context_id(tool_input, project_root, session_id, use_persistent_id=True)
         if not context_id:
             eprint("[task_create_capture] No context available - skipping persistence")
             eprint("[task_create_capture] Task will be ephemeral until context is created")
@@ -180,13 +124,13 @@ def main() -> int:
         # Silent success (no stdout output)
         return 0
 
-    except json.JSONDecodeError as e:
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
         eprint(f"[task_create_capture] JSON decode error: {e}")
         return 0  # Non-blocking
     except Exception as e:
         eprint(f"[task_create_capture] Unexpected error: {e}")
         import traceback
-        eprint(traceback.format_exc())
+        traceback.print_exc(file=sys.stderr)
         return 0  # Non-blocking
 
 
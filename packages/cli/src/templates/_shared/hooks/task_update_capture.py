@@ -31,74 +31,24 @@ Hook output:
 - Logs to stderr for debugging
 """
 import json
+import os
 import sys
-from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Dict, Any
 
 # Add parent directories to path for imports
-SCRIPT_DIR = Path(__file__).resolve().parent
-SHARED_LIB = SCRIPT_DIR.parent / "lib"
-sys.path.insert(0, str(SHARED_LIB.parent))
+_SHARED_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SHARED_ROOT not in sys.path:
+    sys.path.insert(0, _SHARED_ROOT)
 
 from lib.context.task_sync import (
     record_task_started,
     record_task_completed,
     record_task_blocked,
 )
-from lib.context.context_manager import get_all_contexts, get_context_by_session_id
+from lib.context.context_manager import resolve_context_id
 from lib.base.utils import eprint, project_dir
 
 
-def extract_context_id(
-    tool_input: Dict[str, Any],
-    project_root: Path,
-    session_id: Optional[str] = None
-) -> Optional[str]:
-    """
-    Extract context ID from tool input metadata, session, or active contexts.
-
-    Priority:
-    1. metadata.context field
-    2. Session ID lookup (session bound to context)
-    3. Single active context
-    4. None (skips persistence)
-
-    Args:
-        tool_input: Tool input from TaskUpdate
-        project_root: Project root directory
-        session_id: Session ID from hook payload
-
-    Returns:
-        Context ID or None if cannot determine
-    """
-    # Check metadata.context field
-    metadata = tool_input.get("metadata", {})
-    if isinstance(metadata, dict):
-        context = metadata.get("context")
-        if context:
-            return context
-
-    # Check session ID - session may be bound to a context
-    if session_id:
-        try:
-            session_context = get_context_by_session_id(session_id, project_root)
-            if session_context:
-                eprint(f"[task_update_capture] Found context via session_id: {session_context.id}")
-                return session_context.id
-        except Exception as e:
-            eprint(f"[task_update_capture] Failed to lookup context by session: {e}")
-
-    # Check for single active context
-    try:
-        contexts = get_all_contexts(status="active", project_root=project_root)
-        if len(contexts) == 1:
-            return contexts[0].id
-    except Exception as e:
-        eprint(f"[task_update_capture] Failed to get active contexts: {e}")
-
-    return None
-
-
 def get_persistent_task_id(
     claude_task_id: str,
     tool_input: Dict[str, Any]
@@ -134,8 +84,15 @@ def main() -> int:
         0 on success, non-zero on failure (but hook is non-blocking)
     """
     try:
+        # Read hook input as bytes; a payload that never mentions the tool
+        # can't be a TaskUpdate event, so skip parsing it (tool_response can
+        # be large)
+        input_data = sys.stdin.buffer.read()
+        if b'"TaskUpdate"' not in input_data:
+            return 0
+
         # Parse hook input
-        payload = json.load(sys.stdin)
+        payload = json.loads(input_data)
 
         # Validate hook type
         if payload.get("hook_event_name") != "PostToolUse":
@@ -151,9 +108,13 @@ def main() -> int:
             eprint("[task_update_capture] Invalid tool_input: not a dict")
             return 0
 
+        # Canonicalize metadata once; a missing or non-dict value reads as empty
+        metadata = tool_input.get("metadata")
+        if not isinstance(metadata, dict):
+            metadata = {}
+
         # Check for skip_persistence flag (used during hydration to avoid duplicates)
-        metadata = tool_input.get("metadata", {})
-        if isinstance(metadata, dict) and metadata.get("skip_persistence"):
+        if metadata.get("skip_persistence"):
             eprint("[task_update_capture] Skipping persistence (hydration mode)")
             return 0
 
@@ -162,7 +123,7 @@ def main() -> int:
         session_id = payload.get("session_id")
 
         # Extract context ID
-        context_id = extract_context_id(tool_input, project_root, session_id)
+        context_id = resolve_context_id(tool_input, project_root, session_id)
         if not context_id:
             eprint("[task_update_capture] No context available - skipping persistence")
             return 0
@@ -178,7 +139,6 @@ def main() -> int:
 
         # Check for status change
         status = tool_input.get("status")
-        metadata = tool_input.get("metadata", {})
         add_blocked_by = tool_input.get("addBlockedBy", [])
 
         # Handle different update types
@@ -197,24 +157,15 @@ def main() -> int:
         # Status: completed
         elif status == "completed":
             # Extract rich completion context from metadata
-            if isinstance(metadata, dict):
-                evidence = metadata.get("evidence", "Task marked completed")
-                work_summary = metadata.get("work_summary", "")
-                files_changed = metadata.get("files_changed", [])
-                commit_ref = metadata.get("commit_ref", "")
-            else:
-                evidence = "Task marked completed"
-                work_summary = ""
-                files_changed = []
-                commit_ref = ""
+            files_changed = metadata.get("files_changed", [])
 
             success = record_task_completed(
                 context_id=context_id,
                 task_id=persistent_task_id,
-                evidence=evidence,
-                work_summary=work_summary,
+                evidence=metadata.get("evidence", "Task marked completed"),
+                work_summary=metadata.get("work_summary", ""),
                 files_changed=files_changed if isinstance(files_changed, list) else [],
-                commit_ref=commit_ref,
+                commit_ref=metadata.get("commit_ref", ""),
                 project_root=project_root
             )
             if success:
@@ -240,13 +191,13 @@ def main() -> int:
         # Silent success (no stdout output)
         return 0
 
-    except json.JSONDecodeError as e:
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
         eprint(f"[task_update_capture] JSON decode error: {e}")
         return 0  # Non-blocking
     except Exception as e:
         eprint(f"[task_update_capture] Unexpected error: {e}")
         import traceback
-        eprint(traceback.format_exc())
+        traceback.print_exc(file=sys.stderr)
         return 0  # Non-blocking
 
 
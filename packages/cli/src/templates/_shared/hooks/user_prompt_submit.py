@@ -20,26 +20,21 @@ Hook output:
 - Prints system reminders to stdout for context enforcement
 """
 import json
+import os
 import sys
 from pathlib import Path
 from typing import List
 
 # Add parent directories to path for imports
-SCRIPT_DIR = Path(__file__).resolve().parent
-SHARED_LIB = SCRIPT_DIR.parent / "lib"
-sys.path.insert(0, str(SHARED_LIB.parent))
-
+_SHARED_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SHARED_ROOT not in sys.path:
+    sys.path.insert(0, _SHARED_ROOT)
+
+# Only the cheap base modules load eagerly. lib.context.* and the enforcer
+# are imported in main() after the internal-call check, so subprocess calls
+# from the orchestrator/agents/inference skip that import graph entirely.
+from lib.base.subprocess_utils import is_internal_call
 from lib.base.utils import eprint, project_dir
-from lib.context.context_manager import (
-    update_context_session_id,
-    update_plan_status,
-    get_context,
-    get_context_by_session_id,
-)
-from lib.context.task_sync import generate_hydration_instructions
-
-# Import the enforcement module
-from hooks.context_enforcer import determine_context, BlockRequest
 
 
 def _update_in_flight_status(context_id: str, hook_input: dict, project_root: Path) -> None:
@@ -49,6 +44,8 @@ def _update_in_flight_status(context_id: str, hook_input: dict, project_root: Pa
     - If permission_mode == "plan": set to "planning"
     - If permission_mode in ["acceptEdits", "bypassPermissions"]: set to "implementing"
     """
+    from lib.context.context_manager import get_context, update_plan_status
+
     context = get_context(context_id, project_root)
     if not context or not context.in_flight:
         return
@@ -76,16 +73,22 @@ def main():
     Handles context enforcement for all user prompts.
     Uses session_id to detect first prompt vs subsequent prompts.
     """
+    # Internal subprocess calls never bind to a context - skip before any
+    # stdin parsing or context imports; the rest are imported per branch
+    if is_internal_call():
+        return
+
     try:
-        # Read hook input from stdin
-        input_data = sys.stdin.read().strip()
+        # Read hook input as bytes: json.loads detects the encoding itself,
+        # so a long prompt isn't decoded to text and copied by strip() first
+        input_data = sys.stdin.buffer.read()
 
-        if not input_data:
+        if not input_data or input_data.isspace():
             return
 
         try:
             hook_input = json.loads(input_data)
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, UnicodeDecodeError):
             return
 
         # Get user prompt and project root
@@ -95,6 +98,8 @@ def main():
 
         outputs: List[str] = []
 
+        from lib.context.context_manager import get_context_by_session_id
+
         # First-prompt detection: check if session_id is already bound to a context
         existing_context = get_context_by_session_id(session_id, project_root)
 
@@ -106,6 +111,11 @@ def main():
             _update_in_flight_status(existing_context.id, hook_input, project_root)
         elif user_prompt:
             # FIRST prompt - need context detection and potentially task hydration
+            # (enforcer, discovery and task_sync are only loaded on this path)
+            from lib.context.context_manager import update_context_session_id
+            from lib.context.task_sync import generate_hydration_instructions
+            from hooks.context_enforcer import determine_context, BlockRequest
+
             try:
                 context_id, method, context_output = determine_context(user_prompt, project_root, session_id)
                 eprint(f"[user_prompt_submit] Context: {method} -> {context_id}")
@@ -140,7 +150,7 @@ def main():
     except Exception as e:
         eprint(f"[user_prompt_submit] ERROR: {e}")
         import traceback
-        eprint(traceback.format_exc())
+        traceback.print_exc(file=sys.stderr)
 
 
 if __name__ == "__main__":
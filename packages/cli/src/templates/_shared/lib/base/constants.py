@@ -10,6 +10,8 @@ No method subfolders - method is just metadata on the context.
 """
 import os
 import re
+import stat
+from functools import lru_cache
 from pathlib import Path
 
 # Directory names (relative to project root)
@@ -22,6 +24,10 @@ INDEX_FILENAME = "index.json"
 MAX_CONTEXT_ID_LENGTH = 64
 VALID_CONTEXT_ID_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]*[a-z0-9]$|^[a-z0-9]$')
 
+# Any run of characters outside [a-z0-9] becomes one hyphen in
+# sanitize_context_id (underscores are collapsed to hyphens too)
+_ID_SEPARATOR_RUN_PATTERN = re.compile(r'[^a-z0-9]+')
+
 # File size limits
 MAX_EVENT_SIZE = 64 * 1024  # 64KB per event (reasonable limit)
 MAX_INDEX_SIZE = 1024 * 1024  # 1MB for index.json
@@ -54,18 +60,16 @@ def sanitize_context_id(context_id: str) -> str:
     # Normalize to lowercase
     result = context_id.lower()
 
-    # Replace any character that's not alphanumeric, hyphen, or underscore
-    result = re.sub(r'[^a-z0-9_-]', '-', result)
-
-    # Collapse consecutive hyphens/underscores into single hyphen
-    result = re.sub(r'[-_]+', '-', result)
+    # Replace each run of invalid characters, hyphens and underscores with a
+    # single hyphen (one pass: replace and collapse together)
+    result = _ID_SEPARATOR_RUN_PATTERN.sub('-', result)
 
-    # Strip leading/trailing non-alphanumeric
-    result = result.strip('-_')
+    # Strip leading/trailing hyphens
+    result = result.strip('-')
 
     # Truncate to max length
     if len(result) > MAX_CONTEXT_ID_LENGTH:
-        result = result[:MAX_CONTEXT_ID_LENGTH].rstrip('-_')
+        result = result[:MAX_CONTEXT_ID_LENGTH].rstrip('-')
 
     # If nothing left, return default
     return result if result else "context"
@@ -120,17 +124,29 @@ def get_output_dir(project_root: Path = None) -> Path:
     return Path(project_root) / OUTPUT_DIR
 
 
+@lru_cache(maxsize=8)
+def _contexts_dir_for(project_root: Path) -> Path:
+    """Contexts directory for an explicit project root (Paths are immutable, so shared)."""
+    return get_output_dir(project_root) / CONTEXTS_DIR
+
+
 def get_contexts_dir(project_root: Path = None) -> Path:
     """
     Get the contexts directory path.
 
+    Every per-context path helper goes through here, so the result is
+    memoized per explicit project_root. The default root is not cached: it
+    follows CLAUDE_PROJECT_DIR and the cwd, which can change.
+
     Args:
         project_root: Project root directory (default: cwd)
 
     Returns:
         Path to _output/contexts/
     """
-    return get_output_dir(project_root) / CONTEXTS_DIR
+    if project_root is None:
+        return get_output_dir() / CONTEXTS_DIR
+    return _contexts_dir_for(project_root)
 
 
 def get_context_dir(context_id: str, project_root: Path = None) -> Path:
@@ -151,6 +167,18 @@ def get_context_dir(context_id: str, project_root: Path = None) -> Path:
     contexts_dir = get_contexts_dir(project_root)
     result_path = contexts_dir / validated_id
 
+    # The validated ID is a single [a-z0-9-] path component, so the folder
+    # can only lead elsewhere if it is itself a link (symlink, or a Windows
+    # junction/reparse point). One lstat rules that out; the realpath walk
+    # of both paths below only runs for a link.
+    try:
+        st = os.lstat(result_path)
+        if not stat.S_ISLNK(st.st_mode) and not getattr(st, "st_reparse_tag", 0):
+            return result_path
+    except OSError:
+        # Doesn't exist yet (creation) - nothing to follow
+        return result_path
+
     # SECURITY: Verify resolved path stays within contexts directory
     # This prevents symlink attacks and any path manipulation we might have missed
     try:
@@ -158,7 +186,6 @@ def get_context_dir(context_id: str, project_root: Path = None) -> Path:
         contexts_resolved = contexts_dir.resolve()
         # Check that resolved path starts with the contexts directory
         # Use os.path for cross-platform compatibility
-        import os
         resolved_str = os.path.normcase(str(resolved))
         contexts_str = os.path.normcase(str(contexts_resolved))
         if not resolved_str.startswith(contexts_str):
@@ -6,7 +6,8 @@ Supports multiple model tiers: fast (Haiku), standard (Sonnet), smart (Opus).
 import subprocess
 import sys
 import os
-from typing import Optional
+import time
+from typing import Dict, Optional
 from dataclasses import dataclass
 
 
@@ -51,7 +52,6 @@ def inference(
     Returns:
         InferenceResult with success status, output, and any error
     """
-    import time
     start_time = time.time()
 
     model = MODELS.get(level, MODELS["fast"])
@@ -60,13 +60,13 @@ def inference(
     # Combine prompts
     full_prompt = f"{system_prompt}\n\n{user_prompt}"
 
-    # Build command
+    # Build command (the prompt goes over stdin: no argv/command-line length
+    # limits, and no shell quoting of it on Windows)
     cmd = [
         "claude",
         "--model", model,
         "--print",
         "--no-hooks",
-        "-p", full_prompt,
     ]
 
     # Remove ANTHROPIC_API_KEY to force subscription auth
@@ -76,8 +76,11 @@ def inference(
     try:
         result = subprocess.run(
             cmd,
+            input=full_prompt,
             capture_output=True,
             text=True,
+            encoding="utf-8",
+            errors="replace",
             timeout=timeout_sec,
             env=env,
             # Windows needs shell=True for command resolution
@@ -140,11 +143,9 @@ def filter_short_words(text: str) -> str:
     filters out most function words (the, to, a, an, of, on, is, it, etc.)
     """
     # Handle contractions by replacing apostrophes before splitting
-    text = text.replace("'", " ").replace("'", " ")
-    words = text.lower().split()
+    words = text.lower().replace("'", " ").split()
     # Filter to words with 3+ characters and limit to MAX_WORDS
-    filtered = [w for w in words if len(w) >= MIN_WORD_LENGTH][:MAX_WORDS]
-    return ' '.join(filtered)
+    return ' '.join([w for w in words if len(w) >= MIN_WORD_LENGTH][:MAX_WORDS])
 
 
 # System prompt for generating context ID summaries (recognition-focused, not summarization)
@@ -171,11 +172,18 @@ Examples:
 Output ONLY the words separated by spaces, nothing else."""
 
 
+# Successful summaries by prompt, for this process. Failures aren't cached,
+# so a later call can still retry after a timeout.
+_summary_cache: Dict[str, str] = {}
+
+
 def generate_semantic_summary(prompt: str, timeout: int = 15) -> Optional[str]:
     """
     Generate a keyword summary of a user prompt.
 
     Uses Sonnet for quality inference. Returns None if inference fails.
+    Repeat calls with the same prompt in one process reuse the first
+    successful summary instead of spawning the CLI again.
 
     Args:
         prompt: User prompt to summarize
@@ -184,6 +192,10 @@ def generate_semantic_summary(prompt: str, timeout: int = 15) -> Optional[str]:
     Returns:
         Keyword summary string (5-10 words) or None if failed
     """
+    cached = _summary_cache.get(prompt)
+    if cached is not None:
+        return cached
+
     result = inference(
         system_prompt=CONTEXT_ID_SYSTEM_PROMPT,
         user_prompt=prompt,
@@ -209,4 +221,5 @@ def generate_semantic_summary(prompt: str, timeout: int = 15) -> Optional[str]:
     if len(words) < 3 or len(words) > 10:
         return None
 
+    _summary_cache[prompt] = summary
     return summary
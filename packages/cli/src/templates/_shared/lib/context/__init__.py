@@ -1,60 +1,59 @@
-"""Context management for AIW CLI templates."""
-from .context_manager import (
-    Context,
-    InFlightState,
-    get_all_contexts,
-    get_context,
-    create_context,
-    update_context,
-    complete_context,
-    reopen_context,
-    archive_context,
-    update_plan_status,
-    get_context_with_pending_plan,
-    get_context_with_in_flight_work,
-)
-from .event_log import (
-    Task,
-    ContextState,
-    append_event,
-    read_events,
-    get_current_state,
-    are_all_tasks_completed,
-    get_pending_tasks,
-)
-from .cache import (
-    rebuild_index_from_folders,
-    rebuild_archive_index,
-    rebuild_context_from_events,
-    rebuild_all_caches,
-    verify_cache_integrity,
-)
-from .discovery import (
-    discover_contexts_for_session,
-    get_in_flight_context,
-    format_context_list,
-    format_pending_plan_continuation,
-    format_implementation_continuation,
-    format_context_picker_prompt,
-    format_ready_for_new_work,
-)
-from .task_sync import (
-    generate_hydration_instructions,
-    generate_task_summary,
-    record_session_start,
-    record_task_created,
-    record_task_started,
-    record_task_completed,
-    record_task_blocked,
-    generate_next_task_id,
-)
-from .plan_archive import (
-    archive_plan_to_context,
-    get_active_context_for_plan,
-    create_context_from_plan,
-    mark_plan_implementation_started,
-    mark_plan_completed,
-)
+"""Context management for AIW CLI templates.
+
+Re-exports are resolved lazily (PEP 562): hooks import the one submodule
+they need, so e.g. a session lookup through context_manager does not also
+load discovery, task_sync, cache and plan_archive.
+"""
+from importlib import import_module
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "Context": "context_manager",
+    "InFlightState": "context_manager",
+    "get_all_contexts": "context_manager",
+    "get_context": "context_manager",
+    "create_context": "context_manager",
+    "update_context": "context_manager",
+    "complete_context": "context_manager",
+    "complete_contexts": "context_manager",
+    "reopen_context": "context_manager",
+    "archive_context": "context_manager",
+    "update_plan_status": "context_manager",
+    "get_context_with_pending_plan": "context_manager",
+    "get_context_with_in_flight_work": "context_manager",
+    "Task": "event_log",
+    "ContextState": "event_log",
+    "append_event": "event_log",
+    "read_events": "event_log",
+    "get_current_state": "event_log",
+    "are_all_tasks_completed": "event_log",
+    "get_pending_tasks": "event_log",
+    "rebuild_index_from_folders": "cache",
+    "rebuild_archive_index": "cache",
+    "rebuild_context_from_events": "cache",
+    "rebuild_all_caches": "cache",
+    "verify_cache_integrity": "cache",
+    "discover_contexts_for_session": "discovery",
+    "get_in_flight_context": "discovery",
+    "format_context_list": "discovery",
+    "format_pending_plan_continuation": "discovery",
+    "format_implementation_continuation": "discovery",
+    "format_context_picker_prompt": "discovery",
+    "format_ready_for_new_work": "discovery",
+    "generate_hydration_instructions": "task_sync",
+    "generate_task_summary": "task_sync",
+    "record_session_start": "task_sync",
+    "record_task_created": "task_sync",
+    "record_task_started": "task_sync",
+    "record_task_completed": "task_sync",
+    "record_task_blocked": "task_sync",
+    "generate_next_task_id": "task_sync",
+    "archive_plan_to_context": "plan_archive",
+    "get_active_context_for_plan": "plan_archive",
+    "create_context_from_plan": "plan_archive",
+    "mark_plan_implementation_started": "plan_archive",
+    "mark_plan_completed": "plan_archive",
+}
 
 __all__ = [
     # Data Classes
@@ -68,6 +67,7 @@ __all__ = [
     "create_context",
     "update_context",
     "complete_context",
+    "complete_contexts",
     "reopen_context",
     "archive_context",
     "update_plan_status",
@@ -109,3 +109,16 @@ __all__ = [
     "mark_plan_implementation_started",
     "mark_plan_completed",
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -173,7 +173,10 @@ def rebuild_index_from_folders(project_root: Path = None) -> Dict[str, Any]:
                     "created_at": ctx_data.get("created_at"),
                     "last_active": ctx_data.get("last_active"),
                     "folder": str(ctx_dir),
-                    "in_flight_mode": in_flight.get("mode", "none")
+                    "in_flight_mode": in_flight.get("mode", "none"),
+                    "session_ids": in_flight.get("session_ids") or (
+                        [in_flight["session_id"]] if in_flight.get("session_id") else []
+                    ),
                 }
                 continue
             except Exception as e:
@@ -232,7 +235,10 @@ def rebuild_archive_index(project_root: Path = None) -> Dict[str, Any]:
                     "created_at": ctx_data.get("created_at"),
                     "last_active": ctx_data.get("last_active"),
                     "folder": str(ctx_dir),
-                    "in_flight_mode": in_flight.get("mode", "none")
+                    "in_flight_mode": in_flight.get("mode", "none"),
+                    "session_ids": in_flight.get("session_ids") or (
+                        [in_flight["session_id"]] if in_flight.get("session_id") else []
+                    ),
                 }
                 continue
             except Exception as e:
@@ -12,7 +12,7 @@ Data hierarchy:
 import json
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import shutil
 
@@ -99,7 +99,8 @@ class Context:
             "created_at": self.created_at,
             "last_active": self.last_active,
             "folder": self.folder,
-            "in_flight_mode": self.in_flight.mode if self.in_flight else "none"
+            "in_flight_mode": self.in_flight.mode if self.in_flight else "none",
+            "session_ids": list(self.in_flight.session_ids or []) if self.in_flight else []
         }
 
 
@@ -276,33 +277,62 @@ def _remove_from_archive_index_cache(context_id: str, project_root: Path = None)
     return True
 
 
-def archive_context(context_id: str, project_root: Path = None) -> Optional[Context]:
+def _update_index_entries(
+    index_path: Path,
+    upserts: List[Context] = (),
+    removals: List[str] = ()
+) -> bool:
     """
-    Move completed context to archive.
+    Apply several entry changes to an index file with one read and one write.
 
-    1. Verify context exists and is completed
-    2. Move folder to archive location
-    3. Update context.folder to new path
-    4. Append context_archived event
-    5. Remove from main index
-    6. Add to archive index
+    Args:
+        index_path: index.json or archive/index.json path
+        upserts: Contexts to add/update
+        removals: Context identifiers to remove
+
+    Returns:
+        True if successful
+    """
+    index = {"version": "2.0", "updated_at": now_iso(), "contexts": {}}
+
+    if index_path.exists():
+        try:
+            index = json.loads(index_path.read_text(encoding='utf-8'))
+        except Exception as e:
+            eprint(f"[context_manager] WARNING: Failed to read index, recreating: {e}")
+
+    entries = index.setdefault("contexts", {})
+    for context_id in removals:
+        entries.pop(context_id, None)
+    for context in upserts:
+        entries[context.id] = context.to_index_entry()
+    index["updated_at"] = now_iso()
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    content = json.dumps(index, indent=2, ensure_ascii=False)
+    success, error = atomic_write(index_path, content)
+
+    if not success:
+        eprint(f"[context_manager] WARNING: Failed to write index: {error}")
+
+    return success
+
+
+def _move_to_archive(context: Context, project_root: Path = None) -> bool:
+    """
+    Move a completed context's folder into the archive.
+
+    Writes the context_archived event and context.json at the archive
+    location and updates context.folder. Index files are left to the caller.
 
     Args:
-        context_id: Context identifier
+        context: Completed context to move
         project_root: Project root directory
 
     Returns:
-        Archived Context or None if archiving failed
+        True if the folder was moved
     """
-    # Get context (try active location first)
-    context = get_context(context_id, project_root)
-    if not context:
-        eprint(f"[context_manager] Cannot archive: context '{context_id}' not found")
-        return None
-
-    if context.status != "completed":
-        eprint(f"[context_manager] Cannot archive: context '{context_id}' not completed")
-        return None
+    context_id = context.id
 
     # Get source and destination paths
     source_dir = get_context_dir(context_id, project_root)
@@ -311,7 +341,7 @@ def archive_context(context_id: str, project_root: Path = None) -> Optional[Cont
     # Check if already archived
     if archive_dest.exists():
         eprint(f"[context_manager] Cannot archive: archive folder already exists for '{context_id}'")
-        return None
+        return False
 
     # Create archive parent directory
     archive_dest.parent.mkdir(parents=True, exist_ok=True)
@@ -321,7 +351,7 @@ def archive_context(context_id: str, project_root: Path = None) -> Optional[Cont
         shutil.move(str(source_dir), str(archive_dest))
     except Exception as e:
         eprint(f"[context_manager] ERROR: Failed to move context to archive: {e}")
-        return None
+        return False
 
     # Update context folder path
     context.folder = str(archive_dest)
@@ -348,6 +378,40 @@ def archive_context(context_id: str, project_root: Path = None) -> Optional[Cont
     if not success:
         eprint(f"[context_manager] WARNING: Failed to write archive context cache: {error}")
 
+    return True
+
+
+def archive_context(context_id: str, project_root: Path = None) -> Optional[Context]:
+    """
+    Move completed context to archive.
+
+    1. Verify context exists and is completed
+    2. Move folder to archive location
+    3. Update context.folder to new path
+    4. Append context_archived event
+    5. Remove from main index
+    6. Add to archive index
+
+    Args:
+        context_id: Context identifier
+        project_root: Project root directory
+
+    Returns:
+        Archived Context or None if archiving failed
+    """
+    # Get context (try active location first)
+    context = get_context(context_id, project_root)
+    if not context:
+        eprint(f"[context_manager] Cannot archive: context '{context_id}' not found")
+        return None
+
+    if context.status != "completed":
+        eprint(f"[context_manager] Cannot archive: context '{context_id}' not completed")
+        return None
+
+    if not _move_to_archive(context, project_root):
+        return None
+
     # Remove from main index, add to archive index
     _remove_from_index_cache(context_id, project_root)
     _update_archive_index_cache(context, project_root)
@@ -687,6 +751,63 @@ def complete_context(context_id: str, project_root: Path = None) -> Optional[Con
     return archived if archived else context
 
 
+def complete_contexts(context_ids: List[str], project_root: Path = None) -> List[Context]:
+    """
+    Mark several contexts as completed and archive them.
+
+    Bulk form of complete_context() for ^E* and chained ^E commands. Each
+    context still gets its own events and folder move, but index.json and
+    archive/index.json are each rewritten once for the whole batch.
+
+    Args:
+        context_ids: Context identifiers
+        project_root: Project root directory
+
+    Returns:
+        Updated Contexts (those not found are skipped)
+    """
+    results = []
+    archived = []
+    not_archived = []
+
+    for context_id in context_ids:
+        context = get_context(context_id, project_root)
+        if not context:
+            continue
+
+        if context.status == "completed":
+            eprint(f"[context_manager] Context '{context_id}' already completed")
+            results.append(context)
+            continue
+
+        context.status = "completed"
+        context.last_active = now_iso()
+
+        append_event(context_id, EVENT_CONTEXT_COMPLETED, project_root)
+        _write_context_cache(context, project_root)
+
+        eprint(f"[context_manager] Completed context: {context_id}")
+
+        if _move_to_archive(context, project_root):
+            archived.append(context)
+            eprint(f"[context_manager] Archived context: {context_id}")
+        else:
+            not_archived.append(context)
+        results.append(context)
+
+    # Archived entries leave the main index; failed moves stay as completed
+    if archived or not_archived:
+        _update_index_entries(
+            get_index_path(project_root),
+            upserts=not_archived,
+            removals=[c.id for c in archived],
+        )
+    if archived:
+        _update_index_entries(get_archive_index_path(project_root), upserts=archived)
+
+    return results
+
+
 def reopen_context(context_id: str, project_root: Path = None) -> Optional[Context]:
     """
     Reopen a completed context.
@@ -933,7 +1054,14 @@ def get_context_with_in_flight_work(project_root: Path = None) -> Optional[Conte
     return None
 
 
-def get_all_in_flight_contexts(project_root: Path = None) -> List[Context]:
+# In-flight modes that require continuation/action (see get_all_in_flight_contexts)
+IN_FLIGHT_MODES = frozenset({"planning", "pending_implementation"})
+
+
+def get_all_in_flight_contexts(
+    project_root: Path = None,
+    contexts: Optional[List[Context]] = None
+) -> List[Context]:
     """
     Return all contexts with truly in-flight work requiring attention.
 
@@ -952,16 +1080,107 @@ def get_all_in_flight_contexts(project_root: Path = None) -> List[Context]:
 
     Args:
         project_root: Project root directory
+        contexts: Already-loaded active contexts to filter (skips re-reading)
 
     Returns:
         List of contexts with in-flight work requiring attention
     """
-    IN_FLIGHT_MODES = {"planning", "pending_implementation"}
-    contexts = get_all_contexts(status="active", project_root=project_root)
+    if contexts is None:
+        contexts = get_all_contexts(status="active", project_root=project_root)
     return [c for c in contexts if c.in_flight and c.in_flight.mode in IN_FLIGHT_MODES]
 
 
-def get_context_by_session_id(session_id: str, project_root: Path = None) -> Optional[Context]:
+def iter_in_flight_contexts(project_root: Path = None) -> Iterator[Context]:
+    """
+    Lazily yield contexts with in-flight work requiring attention.
+
+    Unlike get_all_in_flight_contexts, results are unordered and loaded one
+    at a time, so a caller that only needs to know whether there is exactly
+    one can stop at the second. Index entries carry in_flight_mode, so
+    contexts that can't be in flight are never loaded; entries without the
+    field are loaded and checked, and a missing/empty index falls back to
+    get_all_in_flight_contexts.
+
+    Args:
+        project_root: Project root directory
+
+    Yields:
+        Contexts whose in-flight mode is planning or pending_implementation
+    """
+    active = _read_active_index_entries(project_root)
+    if not active:
+        yield from get_all_in_flight_contexts(project_root)
+        return
+
+    for ctx_id, entry in active:
+        mode = entry.get("in_flight_mode")
+        if mode is not None and mode not in IN_FLIGHT_MODES:
+            continue
+        context = get_context(ctx_id, project_root)
+        if context and context.in_flight and context.in_flight.mode in IN_FLIGHT_MODES:
+            yield context
+
+
+def _read_active_index_entries(project_root: Path = None) -> Optional[List[tuple]]:
+    """
+    Read the active (context_id, entry) pairs from index.json.
+
+    Args:
+        project_root: Project root directory
+
+    Returns:
+        List of (context_id, entry) pairs, or None if the index is missing
+        or unreadable
+    """
+    index_path = get_index_path(project_root)
+    if not index_path.exists():
+        return None
+    try:
+        entries = json.loads(index_path.read_text(encoding='utf-8')).get("contexts")
+    except Exception:
+        return None
+    if not isinstance(entries, dict):
+        return None
+
+    return [(ctx_id, entry) for ctx_id, entry in entries.items()
+            if isinstance(entry, dict) and entry.get("status") == "active"]
+
+
+def get_session_in_flight_mode(session_id: str, project_root: Path = None) -> Optional[str]:
+    """
+    Look up the in-flight mode of the context bound to a session, from
+    index.json alone (no context.json is read).
+
+    Every mode change goes through update_plan_status, which refreshes the
+    index entry, so in_flight_mode there is current.
+
+    Args:
+        session_id: Session ID to search for
+        project_root: Project root directory
+
+    Returns:
+        The bound context's in_flight_mode, or None if the index can't answer
+        (missing index, entries without session_ids, or no entry lists the
+        session) - callers should fall back to get_context_by_session_id
+    """
+    if not session_id or session_id == "unknown":
+        return None
+
+    for _, entry in _read_active_index_entries(project_root) or ():
+        entry_sessions = entry.get("session_ids")
+        if entry_sessions is None:
+            return None
+        if session_id in entry_sessions:
+            return entry.get("in_flight_mode", "none")
+
+    return None
+
+
+def get_context_by_session_id(
+    session_id: str,
+    project_root: Path = None,
+    contexts: Optional[List[Context]] = None
+) -> Optional[Context]:
     """
     Find context that contains this session_id in its session_ids list.
 
@@ -971,6 +1190,7 @@ def get_context_by_session_id(session_id: str, project_root: Path = None) -> Opt
     Args:
         session_id: Session ID to search for
         project_root: Project root directory
+        contexts: Already-loaded active contexts to search (skips re-reading)
 
     Returns:
         Context containing this session_id, or None if not found
@@ -978,7 +1198,26 @@ def get_context_by_session_id(session_id: str, project_root: Path = None) -> Opt
     if not session_id or session_id == "unknown":
         return None
 
-    contexts = get_all_contexts(status="active", project_root=project_root)
+    if contexts is None:
+        # Index entries carry session_ids, so only the matching context needs
+        # loading. Entries written before that field existed are loaded and
+        # checked as before; a missing/unreadable index falls back to a scan.
+        active = _read_active_index_entries(project_root)
+        if active:
+            matches = []
+            for ctx_id, entry in active:
+                entry_sessions = entry.get("session_ids")
+                if entry_sessions is not None and session_id not in entry_sessions:
+                    continue
+                context = get_context(ctx_id, project_root)
+                if context and context.in_flight and context.in_flight.session_ids:
+                    if session_id in context.in_flight.session_ids:
+                        matches.append(context)
+            # Most recently active match wins, as with the last_active-sorted
+            # get_all_contexts scan (max keeps the first on ties, like that sort)
+            return max(matches, key=lambda c: c.last_active or "", default=None)
+
+        contexts = get_all_contexts(status="active", project_root=project_root)
 
     for context in contexts:
         if context.in_flight and context.in_flight.session_ids:
@@ -988,6 +1227,72 @@ def get_context_by_session_id(session_id: str, project_root: Path = None) -> Opt
     return None
 
 
+def resolve_context_id(
+    tool_input: Dict[str, Any],
+    project_root: Path = None,
+    session_id: Optional[str] = None,
+    use_persistent_id: bool = False
+) -> Optional[str]:
+    """
+    Resolve the context a task tool call belongs to.
+
+    Shared by the TaskCreate/TaskUpdate capture hooks.
+
+    Priority:
+    1. metadata.context field
+    2. Session ID lookup (session bound to context)
+    3. metadata.persistent_id prefix, if use_persistent_id
+       (e.g., "ctx-123-task-1" -> "ctx-123")
+    4. Single active context
+    5. None
+
+    Args:
+        tool_input: Tool input from the task tool
+        project_root: Project root directory
+        session_id: Session ID from hook payload
+        use_persistent_id: Derive the context from metadata.persistent_id
+
+    Returns:
+        Context ID or None if cannot determine
+    """
+    # Check metadata.context field
+    metadata = tool_input.get("metadata", {})
+    if isinstance(metadata, dict):
+        context = metadata.get("context")
+        if context:
+            return context
+
+    # Check session ID - session may be bound to a context
+    if session_id:
+        try:
+            session_context = get_context_by_session_id(session_id, project_root)
+            if session_context:
+                eprint(f"[context_manager] Found context via session_id: {session_context.id}")
+                return session_context.id
+        except Exception as e:
+            eprint(f"[context_manager] Failed to lookup context by session: {e}")
+
+    # Check persistent_id for context hint
+    if use_persistent_id and isinstance(metadata, dict):
+        persistent_id = metadata.get("persistent_id", "")
+        if persistent_id and "-" in persistent_id:
+            # Format: "context-id-task-1" or similar. The context ID is
+            # everything before the last two parts ("a-b" -> "a")
+            head = persistent_id.rpartition("-")[0]
+            context_id, sep, _ = head.rpartition("-")
+            return context_id if sep else head
+
+    # Check for single active context
+    try:
+        contexts = get_all_contexts(status="active", project_root=project_root)
+        if len(contexts) == 1:
+            return contexts[0].id
+    except Exception as e:
+        eprint(f"[context_manager] Failed to get active contexts: {e}")
+
+    return None
+
+
 def create_context_from_prompt(user_prompt: str, project_root: Path = None) -> Context:
     """
     Auto-create a context from the user's prompt.
@@ -1043,7 +1348,8 @@ def update_context_session_id(
         context.in_flight = InFlightState()
     if context.in_flight.session_ids is None:
         context.in_flight.session_ids = []
-    if session_id not in context.in_flight.session_ids:
+    is_new_session = session_id not in context.in_flight.session_ids
+    if is_new_session:
         context.in_flight.session_ids.append(session_id)
 
     # Write updated context
@@ -1051,4 +1357,8 @@ def update_context_session_id(
     content = json.dumps(context.to_dict(), indent=2, ensure_ascii=False)
     success, _ = atomic_write(context_file, content)
 
+    # Keep the index's session_ids in step for get_context_by_session_id
+    if success and is_new_session:
+        _update_index_cache(context, project_root)
+
     return context if success else None
@@ -47,15 +47,18 @@ def archive_plan_to_context(
 
     Returns:
         Tuple of (archived_path, plan_hash) or (None, None) on error
+
+    Raises:
+        FileNotFoundError: If the plan file does not exist
     """
     plan_file = Path(plan_path)
-    if not plan_file.exists():
-        eprint(f"[plan_archive] Plan file not found: {plan_path}")
-        return None, None
 
-    # Read plan content
+    # Read plan content (no separate exists() check - let the open report it)
     try:
         plan_content = plan_file.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        eprint(f"[plan_archive] Plan file not found: {plan_path}")
+        raise
     except Exception as e:
         eprint(f"[plan_archive] Failed to read plan: {e}")
         return None, None